@@ -0,0 +1,199 @@
+"""
+Throughput benchmark for the CMREC chatbot.
+
+Replays a query log and reports queries/sec, p50/p99 latency and peak
+memory, either in-process through engine.get_responses or against a
+running server.py over HTTP:
+
+    python bench.py                                   # built-in sample questions
+    python bench.py --log queries.jsonl --repeat 20
+    python bench.py --log queries.jsonl --batch-size 64
+    python bench.py --url http://127.0.0.1:8080 --concurrency 32 --repeat 50
+
+Peak memory is this process's: the engine in-process, the client with --url.
+A log line is either {"query": "..."} (or "q" / "question"), a JSON string,
+or plain text.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:          # Windows
+    resource = None
+
+import engine
+import knowledge_base
+from engine import get_responses
+
+SAMPLE_QUERIES = [
+    "What are the college timings?",
+    "fee structure for btech management quota",
+    "Which companies come for placements?",
+    "highest package",
+    "Is there a hostel and library?",
+    "where is the college located",
+    "bus routes from secunderabad",
+    "what is the dress code",
+    "upcoming fests and cultural events",
+    "who is the principal, how do I contact",
+    "is it NAAC accredited",
+    "tell me about cmrec",
+    "faculty details",
+    "what's the weather like",
+    "hello",
+]
+
+
+def read_log(path):
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = line
+            if isinstance(entry, dict):
+                entry = entry.get("query") or entry.get("q") or entry.get("question")
+            if isinstance(entry, str) and entry.strip():
+                queries.append(entry)
+    return queries
+
+
+def percentile(sorted_ms, q):
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(q / 100.0 * len(sorted_ms)))]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies_ms, n_queries, wall_s):
+    latencies_ms.sort()
+    return {"queries": n_queries, "seconds": wall_s,
+            "qps": n_queries / wall_s if wall_s else 0.0,
+            "p50_ms": percentile(latencies_ms, 50), "p99_ms": percentile(latencies_ms, 99),
+            "max_ms": latencies_ms[-1] if latencies_ms else 0.0,
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def bench_local(queries, batch_size=1):
+    """In-process: latency is per call of get_responses (one batch)."""
+    kb = knowledge_base.load()
+    if kb is None:
+        sys.exit("could not load college_info.json / keywords.json")
+    get_responses(queries[:batch_size], kb)           # warm up
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        t = time.perf_counter()
+        get_responses(queries[i:i + batch_size], kb)
+        latencies.append((time.perf_counter() - t) * 1000.0)
+    result = summarize(latencies, len(queries), time.perf_counter() - start)
+    result["cache"] = engine.cache.stats()
+    return result
+
+
+async def _client(host, port, path, jobs, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while jobs:
+            body = json.dumps({"query": jobs.pop()}).encode("utf-8")
+            t = time.perf_counter()
+            writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                         f"Content-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            if b" 200 " not in status:
+                raise RuntimeError(f"server answered {status.decode('latin-1').strip()}")
+            latencies.append((time.perf_counter() - t) * 1000.0)
+    finally:
+        writer.close()
+
+
+async def _bench_http(url, queries, concurrency):
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    path = (parts.path.rstrip("/") or "") + "/query"
+    jobs = list(reversed(queries))
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, path, jobs, latencies)
+                           for _ in range(min(concurrency, len(queries)))))
+    return summarize(latencies, len(latencies), time.perf_counter() - start)
+
+
+def bench_http(url, queries, concurrency=8):
+    """Against server.py: latency is client-side round trip per query."""
+    return asyncio.run(_bench_http(url, queries, concurrency))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CMREC chatbot throughput benchmark")
+    parser.add_argument("--log", default=None, help="JSONL query log to replay")
+    parser.add_argument("--repeat", type=int, default=1000 // len(SAMPLE_QUERIES),
+                        help="times to replay the log")
+    parser.add_argument("--batch-size", type=int, default=1, help="questions per get_responses call")
+    parser.add_argument("--url", default=None, help="benchmark a running server.py instead")
+    parser.add_argument("--concurrency", type=int, default=8, help="HTTP connections (with --url)")
+    parser.add_argument("--no-cache", action="store_true", help="match every query from scratch (in-process only; "
+                             "the server's cache is its own)")
+    parser.add_argument("--json", default=None, help="write the results here")
+    args = parser.parse_args(argv)
+
+    if args.no_cache and args.url:
+        parser.error("--no-cache only applies in-process; it cannot reach the server's cache")
+
+    queries = read_log(args.log) if args.log else list(SAMPLE_QUERIES)
+    if not queries:
+        parser.error("no queries to replay")
+    queries = queries * max(1, args.repeat)
+
+    if args.no_cache:
+        engine.cache.maxsize = 0
+    if args.url:
+        result = bench_http(args.url, queries, args.concurrency)
+        mode = f"HTTP {args.url}, {args.concurrency} connections"
+    else:
+        result = bench_local(queries, max(1, args.batch_size))
+        mode = f"in-process, batch size {max(1, args.batch_size)}"
+
+    rss = result["peak_rss_mb"]
+    print(f"{mode}: {result['queries']:,} queries in {result['seconds']:.2f} s")
+    print(f"  {result['qps']:,.0f} q/s   p50 {result['p50_ms']:.3f} ms   "
+          f"p99 {result['p99_ms']:.3f} ms   max {result['max_ms']:.3f} ms"
+          + (f"   peak RSS {rss:.1f} MB" if rss is not None else ""))
+    if result.get("cache") and result["cache"]["maxsize"] > 0:
+        c = result["cache"]
+        print(f"  answer cache: {c['hit_rate']:.1%} hits ({c['hits']:,} / {c['hits'] + c['misses']:,}), "
+              f"{c['size']:,} entries, {c['evictions']:,} evictions")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(dict(result, mode=mode), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Question answering for the CMREC chatbot, without Streamlit.
+
+Used by the Streamlit app (app.py), the HTTP API (server.py) and the
+benchmark (bench.py):
+
+    from engine import get_response, get_responses
+    get_response("what are the fees?")
+    get_responses(["placements", "college timings"])
+
+Matches are memoised in a bounded LRU cache shared by every session and
+keyed on (knowledge-base version, lower-cased query with collapsed
+whitespace), so repeated and Quick Topic questions skip matching entirely;
+only the random reply prefix is picked per call.
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import knowledge_base
+
+PREFIXES = (
+    "Sure! Here's what I found 👇",
+    "Got it! Here's the info:",
+    "Of course 😊",
+    "Here you go:",
+    "Let me help you with that —",
+)
+NOT_LOADED = "⚠️ Data not loaded."
+CACHE_SIZE = int(os.environ.get("CHATBOT_CACHE_SIZE", "4096"))
+
+# section: answered section key (None for the fallback reply)
+# source: "keyword", "retrieval" or "fallback"; score: matcher or BM25 score
+Match = namedtuple("Match", "section source score")
+
+
+def clean_text(text):
+    """Normalize text for better keyword recognition."""
+    text = text.lower()
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    text = text.replace(" or ", " ").replace(" and ", " ")
+    return text.strip()
+
+
+def match(user_input, kb):
+    """Which section answers `user_input` in the compiled base `kb`."""
+    # ---- 1️⃣  Keyword intent detection (highest priority) ----
+    # every intent is scored in one pass; ties go to the earlier intent in keywords.json
+    section, score = kb.matcher.top(clean_text(user_input).split(), allowed=kb.answers)
+    if section:
+        return Match(section, "keyword", score)
+
+    # ---- 2️⃣  Fallback: BM25 over the text of every section ----
+    section, score = kb.retriever.best(user_input)
+    if section:
+        return Match(section, "retrieval", score)
+
+    # ---- 3️⃣  Ultimate fallback ----
+    return Match(None, "fallback", score)
+
+
+class MatchCache:
+    """Thread-safe LRU of query -> Match with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def match(self, user_input, kb):
+        """Same as match(), answered from the cache when possible."""
+        if self.maxsize <= 0:
+            return match(user_input, kb)
+        # clean_text and the BM25 tokenizer both ignore case and spacing
+        key = (kb.version, " ".join(user_input.lower().split()))
+        with self._lock:
+            m = self._data.get(key)
+            if m is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return m
+            self.misses += 1
+        m = match(user_input, kb)
+        with self._lock:
+            self._data[key] = m
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return m
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+cache = MatchCache()
+
+
+def render(m, kb, rng=random):
+    """Reply text for a Match."""
+    if m.section is None:
+        return kb.fallback
+    return rng.choice(PREFIXES) + "\n\n" + kb.answers[m.section]
+
+
+def query_event(user_input, m, kb, latency_ms):
+    """Log record of one answered question (see logging_sink)."""
+    return {"type": "query", "query": user_input, "intent": m.section, "source": m.source,
+            "score": round(m.score, 4), "latency_ms": round(latency_ms, 4),
+            "kb_version": kb.version}
+
+
+def get_response(user_input, kb=None, rng=random, sink=None):
+    """Main intent-matching logic (final-safe version).
+
+    With a logging_sink.JsonlSink as `sink`, a query event is queued for it.
+    """
+    kb = kb or knowledge_base.load()
+    if not kb:
+        return NOT_LOADED
+    start = time.perf_counter()
+    m = cache.match(user_input, kb)
+    reply = render(m, kb, rng)
+    if sink is not None:
+        sink.log(query_event(user_input, m, kb, (time.perf_counter() - start) * 1000.0))
+    return reply
+
+
+def get_responses(batch, kb=None, rng=random, sink=None):
+    """Replies for a list of questions, all answered from one knowledge-base version."""
+    kb = kb or knowledge_base.load()
+    if not kb:
+        return [NOT_LOADED] * len(batch)
+    return [get_response(q, kb, rng, sink) for q in batch]
@@ -0,0 +1,107 @@
+"""
+Compiled, hot-reloadable knowledge base for the CMREC chatbot.
+
+college_info.json and keywords.json are compiled together into a
+KnowledgeBase: the markdown answer of every section rendered once, the
+intent matcher and the BM25 index. load() returns the compiled base for
+the current version of the files; it stats them at most every
+RELOAD_CHECK_SECONDS and rebuilds when their content hash changes, so edits
+go live within seconds without a restart. Answering is then a dict lookup.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from matcher import IntentMatcher, KEYWORDS_FILE
+from retrieval import BM25Index
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(BASE_DIR, "college_info.json")
+RELOAD_CHECK_SECONDS = 2.0
+
+
+def format_section(section):
+    """Convert dictionary or list to formatted markdown."""
+    if isinstance(section, dict):
+        parts = []
+        if "info" in section:
+            parts.append(f"**{section['info']}**")
+        if "details" in section:
+            if isinstance(section["details"], dict):
+                details = "\n".join([f"**{k}:** {v}" for k, v in section["details"].items()])
+                parts.append(details)
+            else:
+                parts.append(section["details"])
+        if "list" in section:
+            parts.append("**Highlights:**\n" + "\n".join([f"- {i}" for i in section["list"]]))
+        if "note" in section:
+            parts.append(f"📝 {section['note']}")
+        return "\n\n".join(parts)
+    return str(section)
+
+
+class KnowledgeBase:
+    """One version of the knowledge base, with everything answers need precomputed."""
+
+    def __init__(self, data, keywords, version):
+        self.data = data
+        self.version = version
+        self.answers = {key: format_section(section)
+                        for key, section in data.items() if isinstance(section, dict)}
+        self.matcher = IntentMatcher(keywords)
+        self.retriever = BM25Index(data)
+        fallback = data.get("fallback", "🤔 I’m not sure about that.")
+        suggestions = ", ".join(data.get("fallback_replies", ["Placements", "Fees", "Facilities"]))
+        self.fallback = f"{fallback}\nTry asking about {suggestions}."
+
+
+_lock = threading.Lock()
+_loaded = {}         # (data file, keywords file) -> [KnowledgeBase, stat signature, last check]
+
+
+def _stat(paths):
+    return tuple((os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+
+
+def _compile(paths):
+    blobs = []
+    for p in paths:
+        with open(p, "rb") as f:
+            blobs.append(f.read())
+    version = hashlib.sha1(b"\0".join(blobs)).hexdigest()[:12]
+    data, keywords = (json.loads(b.decode("utf-8")) for b in blobs)
+    return version, data, keywords
+
+
+def load(data_file=DATA_FILE, keywords_file=KEYWORDS_FILE):
+    """Current KnowledgeBase, or None if it has never loaded successfully.
+
+    If the files are mid-edit (missing or invalid JSON) the last good
+    version keeps being served.
+    """
+    paths = (data_file, keywords_file)
+    now = time.monotonic()
+    with _lock:
+        entry = _loaded.get(paths)
+        if entry is not None and now - entry[2] < RELOAD_CHECK_SECONDS:
+            return entry[0]
+        try:
+            signature = _stat(paths)
+            if entry is not None and signature == entry[1]:
+                entry[2] = now
+                return entry[0]
+            version, data, keywords = _compile(paths)
+        except (OSError, ValueError):
+            if entry is not None:
+                entry[2] = now
+                return entry[0]
+            return None
+        if entry is not None and version == entry[0].version:
+            kb = entry[0]                    # touched but unchanged
+        else:
+            kb = KnowledgeBase(data, keywords, version)
+        _loaded[paths] = [kb, signature, now]
+        return kb
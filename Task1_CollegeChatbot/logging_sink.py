@@ -0,0 +1,186 @@
+"""
+Non-blocking JSONL logging for the CMREC chatbot.
+
+log() only puts the event on a bounded in-memory queue (dropping it if the
+queue is full), so a user's request never waits on disk. A background
+thread writes queued events in batches, at the latest every FLUSH_SECONDS,
+as one JSON object per line, and rotates the file once it reaches
+MAX_BYTES (queries.jsonl -> queries.jsonl.1 -> ... .BACKUPS).
+
+    sink = get_sink("queries")      # <LOG_DIR>/queries.jsonl, one per process
+    sink.log({"type": "query", "query": "fees", "intent": "fees", ...})
+
+    python logging_sink.py summary logs/queries.jsonl    # matcher analytics
+"""
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+LOG_DIR = os.environ.get("CHATBOT_LOG_DIR",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"))
+MAX_QUEUE = 10_000
+BATCH_SIZE = 256
+FLUSH_SECONDS = 1.0
+MAX_BYTES = 5 * 1024 * 1024
+BACKUPS = 5
+
+_STOP = object()
+
+
+class JsonlSink:
+    """Append-only JSONL file fed from a bounded queue by a writer thread."""
+
+    def __init__(self, path, max_queue=MAX_QUEUE, batch_size=BATCH_SIZE,
+                 flush_seconds=FLUSH_SECONDS, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = queue.Queue(max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f"log-{os.path.basename(path)}",
+                                        daemon=True)
+        self._thread.start()
+
+    def log(self, event):
+        """Queue one event (a JSON-serialisable dict); False if it had to be dropped."""
+        event.setdefault("ts", round(time.time(), 3))
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=5.0):
+        """Write everything still queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+
+    # ---------- writer thread ----------
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                event = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                event = None
+            if event is _STOP:
+                self._write(batch)
+                return
+            if event is not None:
+                batch.append(event)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_seconds
+
+    def _write(self, batch):
+        if not batch:
+            return
+        data = "".join(json.dumps(e, ensure_ascii=False, default=str) + "\n"
+                       for e in batch).encode("utf-8")
+        try:
+            if os.path.exists(self.path) and \
+                    os.path.getsize(self.path) + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "ab") as f:
+                f.write(data)
+            self.written += len(batch)
+        except OSError:
+            self.errors += 1
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def get_sink(name, log_dir=LOG_DIR):
+    """The process-wide sink writing <log_dir>/<name>.jsonl."""
+    path = os.path.join(log_dir, f"{name}.jsonl")
+    with _sinks_lock:
+        sink = _sinks.get(path)
+        if sink is None:
+            sink = _sinks[path] = JsonlSink(path)
+        return sink
+
+
+@atexit.register
+def close_all():
+    for sink in list(_sinks.values()):
+        sink.close()
+
+
+# ---------- analytics ----------
+def summarize(paths, top=10):
+    """Counts per answer source and intent, latency, and the most common misses."""
+    sources, intents, misses = Counter(), Counter(), Counter()
+    latencies = defaultdict(list)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("type") != "query":
+                    continue
+                sources[event.get("source")] += 1
+                intents[event.get("intent")] += 1
+                latencies[event.get("intent")].append(event.get("latency_ms", 0.0))
+                if event.get("source") == "fallback":
+                    misses[event.get("query", "").strip().lower()] += 1
+
+    total = sum(sources.values())
+    print(f"{total:,} queries")
+    for source, n in sources.most_common():
+        print(f"  {source:<10}{n:>9,}  {n / total:6.1%}")
+    print(f"\n{'intent':<14}{'queries':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    for intent, n in intents.most_common():
+        ms = sorted(latencies[intent])
+        print(f"{str(intent):<14}{n:>9,}{ms[len(ms) // 2]:>9.3f}"
+              f"{ms[min(len(ms) - 1, int(0.99 * len(ms)))]:>9.3f}")
+    if misses:
+        print("\nmost common unanswered questions:")
+        for q, n in misses.most_common(top):
+            print(f"  {n:>5}  {q}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CMREC chatbot log analytics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("summary", help="summarise query logs")
+    p.add_argument("paths", nargs="*", default=[os.path.join(LOG_DIR, "queries.jsonl")])
+    p.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    if missing:
+        sys.exit(f"no such log: {', '.join(missing)}")
+    summarize(args.paths, args.top)
+
+
+if __name__ == "__main__":
+    main()
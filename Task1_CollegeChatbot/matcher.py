@@ -0,0 +1,118 @@
+"""
+Intent matcher for the CMREC chatbot.
+
+keywords.json maps each intent (a section key of college_info.json) to its
+keywords and an optional weight. It is compiled once into:
+
+- an inverted index: single-word keyword -> [keyword ids]
+- a word-level Aho-Corasick automaton for multi-word phrases
+  ("college timings", "fee structure")
+
+so a query is scored against every intent in one pass over its tokens,
+however many intents and synonyms the file holds.
+"""
+
+import json
+import os
+from collections import deque
+
+KEYWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords.json")
+
+
+class IntentMatcher:
+    """Scores every intent for a tokenised query in a single pass."""
+
+    def __init__(self, intents):
+        """`intents` maps intent -> {"keywords": [...], "weight": 1.0}.
+
+        Intents listed earlier win ties.
+        """
+        self.intents = list(intents)
+        self.rank = {intent: i for i, intent in enumerate(self.intents)}
+        self.weights = []              # keyword id -> (intent, score it adds)
+        self.index = {}                # word -> [keyword ids]
+        # automaton: goto[state] = {word: state}, fail[state], out[state] = [keyword ids]
+        self.goto, self.fail, self.out = [{}], [0], [[]]
+
+        for intent, spec in intents.items():
+            weight = float(spec.get("weight", 1.0))
+            for keyword in spec.get("keywords", []):
+                words = keyword.lower().split()
+                if not words:
+                    continue
+                kid = len(self.weights)
+                # longer phrases are more specific, so they count per word
+                self.weights.append((intent, weight * len(words)))
+                if len(words) == 1:
+                    self.index.setdefault(words[0], []).append(kid)
+                else:
+                    self._add_phrase(words, kid)
+        self._link()
+
+    @classmethod
+    def from_file(cls, filepath=KEYWORDS_FILE):
+        with open(filepath, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    # ---------- automaton ----------
+    def _add_phrase(self, words, kid):
+        state = 0
+        for word in words:
+            nxt = self.goto[state].get(word)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][word] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append(kid)
+
+    def _link(self):
+        """Breadth-first failure links; outputs of suffix states are merged in."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and word not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(word, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def _step(self, state, word):
+        while state and word not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(word, 0)
+
+    # ---------- scoring ----------
+    def scores(self, tokens):
+        """{intent: score} for every intent with at least one keyword in `tokens`.
+
+        A keyword counts once however often it appears.
+        """
+        seen = set()
+        totals = {}
+        state = 0
+        for word in tokens:
+            hits = list(self.index.get(word, ()))
+            if self.goto[0]:
+                state = self._step(state, word)
+                hits.extend(self.out[state])
+            for kid in hits:
+                if kid in seen:
+                    continue
+                seen.add(kid)
+                intent, score = self.weights[kid]
+                totals[intent] = totals.get(intent, 0.0) + score
+        return totals
+
+    def top(self, tokens, allowed=None):
+        """(top intent, its score), optionally restricted to `allowed`; (None, 0.0) if none."""
+        totals = self.scores(tokens)
+        candidates = [i for i in totals if allowed is None or i in allowed]
+        if not candidates:
+            return None, 0.0
+        intent = min(candidates, key=lambda i: (-totals[i], self.rank[i]))
+        return intent, totals[intent]
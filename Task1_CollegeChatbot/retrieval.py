@@ -0,0 +1,84 @@
+"""
+BM25 retrieval over the text of every knowledge-base section.
+
+Each section of college_info.json (its name plus info / details / list /
+note) is one document. At build time the documents are turned into
+inverted postings, term -> [(section, weight)], with the BM25 weight of the
+term in that section precomputed, so answering a query is only a sum over
+the postings of its terms.
+"""
+
+import math
+import re
+from collections import Counter
+
+K1 = 1.5
+B = 0.75
+MIN_SCORE = 1.5          # best score below this is treated as "no answer"
+
+STOPWORDS = frozenset("""
+a an the is are was were be been am do does did can could will would should
+i me my we our you your it its this that these those there here what which
+who whom whose when how why of in on at to for from by with as and or not
+tell give show know please get any some all about
+""".split())
+
+
+def tokenize(text):
+    """Lowercase alphanumeric words, stopwords removed."""
+    return [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+
+
+def section_text(name, section):
+    """Everything searchable in one section, as plain text."""
+    parts = [name]
+    if isinstance(section, dict):
+        for field in ("info", "details", "list", "note"):
+            value = section.get(field)
+            if isinstance(value, dict):
+                parts.extend(f"{k} {v}" for k, v in value.items())
+            elif isinstance(value, list):
+                parts.extend(str(v) for v in value)
+            elif value:
+                parts.append(str(value))
+    else:
+        parts.append(str(section))
+    return " ".join(parts)
+
+
+class BM25Index:
+    """Okapi BM25 over the sections of a knowledge base."""
+
+    def __init__(self, data, k1=K1, b=B, min_score=MIN_SCORE):
+        self.min_score = min_score
+        # only the structured sections are answers; name/website/fallback are not
+        self.sections = [key for key, value in data.items() if isinstance(value, dict)]
+        docs = [Counter(tokenize(section_text(key, data[key]))) for key in self.sections]
+        n = len(docs)
+        avg_len = sum(sum(d.values()) for d in docs) / n if n else 0.0
+
+        df = Counter(term for d in docs for term in d)
+        self.postings = {}
+        for doc_id, counts in enumerate(docs):
+            norm = k1 * (1 - b + b * sum(counts.values()) / avg_len) if avg_len else k1
+            for term, tf in counts.items():
+                idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+                weight = idf * tf * (k1 + 1) / (tf + norm)
+                self.postings.setdefault(term, []).append((doc_id, weight))
+
+    def search(self, query, top_n=3):
+        """[(section, score)] best first, for sections sharing a term with `query`."""
+        scores = {}
+        for term in set(tokenize(query)):
+            for doc_id, weight in self.postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_n]
+        return [(self.sections[doc_id], score) for doc_id, score in ranked]
+
+    def best(self, query):
+        """(top section, score); the section is None below the confidence threshold."""
+        hits = self.search(query, top_n=1)
+        if not hits:
+            return None, 0.0
+        section, score = hits[0]
+        return (section if score >= self.min_score else None), score
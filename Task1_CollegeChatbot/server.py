@@ -0,0 +1,143 @@
+"""
+Minimal asyncio HTTP API for the CMREC chatbot (standard library only).
+
+    python server.py --port 8080
+
+    POST /query   {"query": "what are the fees?"}
+                  -> {"answer": ..., "section": "fees", "source": "keyword", "score": 1.0}
+    POST /query   {"queries": ["fees", "placements"]}   -> {"answers": [...]}
+    GET  /health  -> {"status": "ok", "version": <knowledge-base version>,
+                      "cache": {"hits": ..., "misses": ..., "hit_rate": ...}}
+
+Connections are kept alive between requests so a load generator can reuse
+them. Answering is pure CPU work of a few microseconds, so it runs on the
+event loop directly.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import knowledge_base
+import engine
+from engine import NOT_LOADED, query_event, render
+from logging_sink import get_sink
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 503: "Service Unavailable"}
+
+sink = None          # logging_sink.JsonlSink for query events (set by main)
+
+
+def answer(question, kb):
+    start = time.perf_counter()
+    m = engine.cache.match(question, kb)
+    reply = render(m, kb)
+    if sink is not None:
+        sink.log(query_event(question, m, kb, (time.perf_counter() - start) * 1000.0))
+    return {"answer": reply, "section": m.section, "source": m.source,
+            "score": round(m.score, 4)}
+
+
+def handle(method, path, body):
+    """(status, payload) for one request."""
+    if path == "/health":
+        kb = knowledge_base.load()
+        if not kb:
+            return 503, {"status": "error", "error": NOT_LOADED}
+        return 200, {"status": "ok", "version": kb.version, "cache": engine.cache.stats()}
+    if path != "/query":
+        return 404, {"error": "not found"}
+    if method != "POST":
+        return 405, {"error": "use POST"}
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        return 400, {"error": "body must be JSON"}
+    if not isinstance(request, dict):
+        return 400, {"error": "body must be a JSON object"}
+    kb = knowledge_base.load()
+    if not kb:
+        return 503, {"error": NOT_LOADED}
+    if isinstance(request.get("queries"), list):
+        return 200, {"answers": [answer(str(q), kb) for q in request["queries"]]}
+    if isinstance(request.get("query"), str):
+        return 200, answer(request["query"], kb)
+    return 400, {"error": "expected {\"query\": str} or {\"queries\": [str, ...]}"}
+
+
+async def serve_client(reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, path, version = request_line.decode("latin-1").split()
+            except ValueError:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                length = MAX_BODY + 1
+            if length > MAX_BODY or length < 0:
+                status, payload = 413, {"error": "body too large"}
+                keep_alive = False
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload = handle(method.upper(), path.split("?", 1)[0], body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                + data)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(host, port):
+    server = await asyncio.start_server(serve_client, host, port)
+    print(f"Serving CMREC chatbot on http://{host}:{port} (POST /query, GET /health)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API for the CMREC chatbot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--no-log", action="store_true", help="do not log queries")
+    args = parser.parse_args(argv)
+    if knowledge_base.load() is None:
+        parser.error("could not load college_info.json / keywords.json")
+    global sink
+    if not args.no_log:
+        sink = get_sink("queries")
+    try:
+        asyncio.run(run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# ----------------------- SELF-PLAY ARENA -----------------------
+# Plays many headless games between the AI difficulties (and a uniformly
+# random player) across a process pool, and reports per player:
+#   win / draw / loss rates, nodes searched, nodes/s, per-move latency.
+#
+# The difficulties play 3x3 from the solution table, so they search no
+# nodes there.  "Search" always searches: on 3x3 it is engine.best_move()
+# from an empty transposition table every move (so its nodes/s tracks the
+# speed of the negamax code), on larger boards the SearchEngine at full
+# strength.
+#
+#   python arena.py                                  # 3x3, every player vs random
+#   python arena.py --opponent Impossible --games 5000
+#   python arena.py --size 7 --k 5 --games 40 --budget-ms 50 --max-depth 3
+#   python arena.py --json run.json --baseline last.json   # exit 1 on regression
+#
+# Every game has its own seed (derived from --seed and the game number) and
+# players alternate who moves first, so a run is reproducible move for move
+# as long as searches are bounded by --max-depth rather than by time.
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import engine
+from search import SearchEngine, winning_lines
+from search_stats import SearchStats
+
+PLAYERS = ["random", "Easy", "Medium", "Impossible", "Search"]
+
+_searchers = {}          # per process: (size, k, symbol) -> SearchEngine
+
+
+def _searcher(size, k, symbol):
+    """Fresh-state engine for one side (each side keeps its own TT)."""
+    if (size, k) == (3, 3):
+        return None      # 3x3 plays from the solution table
+    key = (size, k, symbol)
+    if key not in _searchers:
+        _searchers[key] = SearchEngine(size, k)
+    searcher = _searchers[key]
+    searcher.tt.clear()
+    searcher.history = [0] * searcher.n
+    return searcher
+
+
+def _winner(board, size, k, last):
+    """Symbol that completed a line through `last`, "Tie", or None."""
+    symbol = board[last]
+    for line in winning_lines(size, k):
+        if last in line and all(board[i] == symbol for i in line):
+            return symbol
+    return "Tie" if "" not in board else None
+
+
+def play_game(spec):
+    """One game; spec = (player, opponent, player_first, size, k, seed, budget_ms, max_depth).
+
+    Returns (spec, outcome for player: "W"/"D"/"L", player's move stats)
+    where the stats are a list of (latency_ms, nodes) per move.
+    """
+    player, opponent, player_first, size, k, seed, budget_ms, max_depth = spec
+    rng = random.Random(seed)
+    searchers = {s: _searcher(size, k, s) for s in ("X", "O")}
+    sides = {"X": player if player_first else opponent,
+             "O": opponent if player_first else player}
+    mine = "X" if player_first else "O"
+
+    board = [""] * (size * size)
+    turn, other = "X", "O"
+    stats = []
+    while True:
+        mode = sides[turn]
+        start = time.perf_counter()
+        searcher = searchers[turn]
+        if searcher is not None:
+            searcher.nodes = 0
+        nodes = 0
+        if mode == "random":
+            move = rng.choice([i for i, v in enumerate(board) if v == ""])
+        elif mode == "Search" and searcher is None:
+            engine.clear_table()
+            search_stats = SearchStats()
+            move = engine.best_move(board, turn, other, search_stats)
+            nodes = search_stats.nodes
+        else:
+            move = engine.choose_move(board, turn, other,
+                                      "Impossible" if mode == "Search" else mode, rng=rng,
+                                      searcher=searcher, budget_ms=budget_ms, max_depth=max_depth)
+        if searcher is not None:
+            nodes = searcher.nodes
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if turn == mine:
+            stats.append((elapsed, nodes))
+        board[move] = turn
+        result = _winner(board, size, k, move)
+        if result is not None:
+            break
+        turn, other = other, turn
+
+    outcome = "D" if result == "Tie" else "W" if result == mine else "L"
+    return spec, outcome, stats
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100.0 * len(sorted_values)))]
+
+
+def run(players, opponent, games, size=3, k=3, seed=0, workers=None,
+        budget_ms=None, max_depth=None):
+    """Play `games` games per player against `opponent`; returns the report dict."""
+    specs = [(p, opponent, g % 2 == 0, size, k, seed * 1_000_003 + i * games + g,
+              budget_ms, max_depth)
+             for i, p in enumerate(players) for g in range(games)]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            chunk = max(1, len(specs) // (workers * 8))
+            results = list(pool.imap_unordered(play_game, specs, chunksize=chunk))
+    else:
+        results = [play_game(spec) for spec in specs]
+
+    report = {"size": size, "k": k, "games": games, "opponent": opponent, "seed": seed,
+              "players": {}}
+    for p in players:
+        outcomes = {"W": 0, "D": 0, "L": 0}
+        latencies, nodes = [], 0
+        for spec, outcome, stats in results:
+            if spec[0] != p:
+                continue
+            outcomes[outcome] += 1
+            latencies.extend(ms for ms, _ in stats)
+            nodes += sum(n for _, n in stats)
+        latencies.sort()
+        total_ms = sum(latencies)
+        report["players"][p] = {
+            "win": outcomes["W"] / games, "draw": outcomes["D"] / games,
+            "loss": outcomes["L"] / games, "moves": len(latencies), "nodes": nodes,
+            "nodes_per_s": nodes / (total_ms / 1000.0) if total_ms else 0.0,
+            "latency_ms": {"p50": _percentile(latencies, 50), "p90": _percentile(latencies, 90),
+                           "p99": _percentile(latencies, 99),
+                           "max": latencies[-1] if latencies else 0.0},
+        }
+    return report
+
+
+def compare(baseline, report, strength_tol=0.02, speed_tol=0.5):
+    """Regression messages: score (win + draw/2), nodes/s or latency got worse.
+
+    Latency is only compared for moves slow enough (>= 1 ms p50) to measure
+    reliably; table lookups are microseconds and mostly noise.
+    """
+    setup = ("size", "k", "opponent", "games", "seed")
+    if any(baseline.get(key) != report[key] for key in setup):
+        return ["baseline was run with a different size/k/opponent/games/seed"]
+    problems = []
+    for p, now in report["players"].items():
+        before = baseline.get("players", {}).get(p)
+        if before is None:
+            continue
+        score_now = now["win"] + now["draw"] / 2
+        score_before = before["win"] + before["draw"] / 2
+        if score_now < score_before - strength_tol:
+            problems.append(f"{p}: score {score_before:.3f} -> {score_now:.3f}")
+        if before["nodes_per_s"] > 0 and \
+                now["nodes_per_s"] < before["nodes_per_s"] / (1 + speed_tol):
+            problems.append(f"{p}: nodes/s {before['nodes_per_s']:,.0f} -> {now['nodes_per_s']:,.0f}")
+        p50_now, p50_before = now["latency_ms"]["p50"], before["latency_ms"]["p50"]
+        if p50_before >= 1.0 and p50_now > p50_before * (1 + speed_tol):
+            problems.append(f"{p}: p50 latency {p50_before:.3f} -> {p50_now:.3f} ms")
+    return problems
+
+
+def print_report(report):
+    print(f"\n{report['size']}x{report['size']}, {report['k']} in a row — "
+          f"{report['games']} games each vs {report['opponent']} (seed {report['seed']})")
+    print(f"{'player':<11}{'win':>7}{'draw':>7}{'loss':>7}{'nodes':>11}{'nodes/s':>11}"
+          f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    for p, r in report["players"].items():
+        lat = r["latency_ms"]
+        print(f"{p:<11}{r['win']:>7.1%}{r['draw']:>7.1%}{r['loss']:>7.1%}{r['nodes']:>11,}"
+              f"{r['nodes_per_s']:>11,.0f}{lat['p50']:>9.3f}{lat['p90']:>9.3f}{lat['p99']:>9.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless tic-tac-toe AI arena")
+    parser.add_argument("--players", default="Easy,Medium,Impossible,Search")
+    parser.add_argument("--opponent", default="random", choices=PLAYERS)
+    parser.add_argument("--games", type=int, default=1000, help="games per player")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--k", type=int, default=None, help="stones in a row (default: size, max 5)")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="search time per move on boards larger than 3x3")
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write the report here")
+    parser.add_argument("--baseline", default=None, help="earlier --json report to compare with")
+    args = parser.parse_args(argv)
+
+    players = [p for p in args.players.split(",") if p]
+    unknown = set(players) - set(PLAYERS)
+    if unknown:
+        parser.error(f"unknown players: {', '.join(sorted(unknown))}")
+    k = args.k or min(args.size, 5)
+
+    report = run(players, args.opponent, args.games, args.size, k, args.seed,
+                 args.workers, args.budget_ms, args.max_depth)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(json.load(f), report)
+        for msg in problems:
+            print("REGRESSION", msg)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# ----------------------- BITBOARD ENGINE -----------------------
+# Each side is a 9-bit int (bit i = square i, row-major).  A win is a
+# precomputed lookup on those bits, and every solved position is cached in a
+# transposition table keyed by the canonical form of (side to move,
+# opponent) under the 8 rotations/reflections of the board, so positions
+# reached by different move orders (or mirrored) are solved only once.
+#
+# Scores are from the side to move's point of view: a win finished with
+# n stones on the board is worth 10 - n (faster wins score higher), a loss
+# n - 10, a tie 0.  For any root these rank moves exactly like
+# minimax()'s 10 - depth / depth - 10 in tictactoe.py, because the stone
+# count and the search depth differ by the same constant for every move.
+#
+# choose_move() is the difficulty policy shared by the GUI and arena.py.
+# Searches take an optional search_stats.SearchStats as `stats`.
+
+import random
+
+WIN_LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),      # rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),      # cols
+    (0, 4, 8), (2, 4, 6),                 # diagonals
+)
+WIN_MASKS = tuple(sum(1 << i for i in line) for line in WIN_LINES)
+FULL = (1 << 9) - 1
+
+# chance that the AI plays a uniformly random rank instead of the best move
+RANDOM_RANK_CHANCE = {"Easy": 0.8, "Medium": 0.5, "Impossible": 0.0}
+# per-move thinking time of the search engine on boards larger than 3x3
+MOVE_BUDGET_MS = {"Easy": 150, "Medium": 400, "Impossible": 1000}
+
+# IS_WIN[bits] -> True if those stones contain a full line
+IS_WIN = tuple(any(bits & m == m for m in WIN_MASKS) for bits in range(1 << 9))
+POPCOUNT = tuple(bin(bits).count("1") for bits in range(1 << 9))
+
+
+def _symmetries():
+    """The 8 board symmetries as square permutations (new index -> old)."""
+    def rotate(p):        # 90 degrees clockwise
+        return tuple(p[(2 - c) * 3 + r] for r in range(3) for c in range(3))
+
+    def reflect(p):       # mirror left-right
+        return tuple(p[r * 3 + (2 - c)] for r in range(3) for c in range(3))
+
+    perms = []
+    p = tuple(range(9))
+    for _ in range(4):
+        perms.extend([p, reflect(p)])
+        p = rotate(p)
+    return perms
+
+
+# SYMMETRY_TABLES[s][bits] -> bits mapped through symmetry s
+SYMMETRY_TABLES = tuple(
+    tuple(sum(1 << new for new, old in enumerate(perm) if bits >> old & 1)
+          for bits in range(1 << 9))
+    for perm in _symmetries()
+)
+
+_table = {}
+
+
+def clear_table():
+    """Forget every solved position (so the next search starts cold)."""
+    _table.clear()
+
+
+def canonical(me, opp):
+    """Smallest (me, opp) pair over the 8 symmetric images of the position."""
+    return min((t[me], t[opp]) for t in SYMMETRY_TABLES)
+
+
+def negamax(me, opp, stats=None, ply=0):
+    """Exact value of the position for the side to move (`me`)."""
+    if stats is not None:
+        stats.nodes += 1
+        stats.max_depth = max(stats.max_depth, ply)
+    if IS_WIN[opp]:
+        return POPCOUNT[me | opp] - 10
+    occupied = me | opp
+    if occupied == FULL:
+        return 0
+    key = canonical(me, opp)
+    value = _table.get(key)
+    if stats is not None:
+        stats.tt_probes += 1
+        stats.tt_hits += value is not None
+    if value is not None:
+        return value
+
+    value = -10
+    free = FULL & ~occupied
+    while free:
+        bit = free & -free
+        free ^= bit
+        score = -negamax(opp, me | bit, stats, ply + 1)
+        if score > value:
+            value = score
+    _table[key] = value
+    return value
+
+
+def to_bits(board, symbol):
+    return sum(1 << i for i, v in enumerate(board) if v == symbol)
+
+
+def move_scores(board, ai, human, stats=None):
+    """{square: score for `ai` after playing there} for every empty square."""
+    me, opp = to_bits(board, ai), to_bits(board, human)
+    scores = {i: -negamax(opp, me | (1 << i), stats, 1)
+              for i in range(9) if not (me | opp) >> i & 1}
+    if stats is not None:
+        stats.finish()
+    return scores
+
+
+def best_move(board, ai, human, stats=None):
+    """Optimal square for `ai`; the lowest index among equally good moves."""
+    best_score = None
+    best_idx = None
+    for i, score in move_scores(board, ai, human, stats).items():
+        if best_score is None or score > best_score:
+            best_score = score
+            best_idx = i
+    return best_idx
+
+
+def choose_move(board, me, opp, mode, rng=random, searcher=None, budget_ms=None,
+                max_depth=None, stop=None, progress=None, stats=None):
+    """The AI's move for difficulty `mode`, or None if the board is full.
+
+    3x3 boards (no `searcher`) rank the moves from the solution table: the
+    best one, or with RANDOM_RANK_CHANCE[mode] a uniformly random one.  The
+    table assumes X moved first, so `me` must be the side to move by count.
+    Larger boards use `searcher` (a search.SearchEngine) for the best move
+    and pick random moves among its candidate cells.
+    """
+    chance = RANDOM_RANK_CHANCE.get(mode, 0.0)
+    if searcher is None:
+        import solution_table            # imports this module
+        ranked = solution_table.ranked_moves(board)
+        if not ranked:
+            return None
+        return ranked[rng.randrange(len(ranked))] if rng.random() < chance else ranked[0]
+
+    if rng.random() < chance:
+        moves = searcher.candidate_moves(board, me, opp)
+        return rng.choice(moves) if moves else None
+    if budget_ms is None:
+        budget_ms = MOVE_BUDGET_MS.get(mode, 1000)
+    return searcher.search(board, me, opp, budget_ms, max_depth=max_depth,
+                           stop=stop, progress=progress, stats=stats).move
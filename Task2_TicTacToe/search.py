@@ -0,0 +1,332 @@
+# ----------------------- N x N, K-IN-A-ROW SEARCH -----------------------
+# Boards of any size with any winning run length (5x5 four-in-a-row, 15x15
+# gomoku, ...).  The 3x3 game is solved exactly by engine.py and the
+# solution table; larger boards cannot be, so this engine searches under a
+# time budget:
+#
+#   * iterative deepening negamax with alpha-beta; the deepest fully
+#     searched depth gives the move when the budget runs out
+#   * move ordering: transposition-table move, then killer moves for the
+#     ply, then the history heuristic, then closeness to the centre
+#   * Zobrist-hashed transposition table, kept between moves of a game
+#   * wins are detected by counting the run through the last stone only
+#   * at the horizon, every window of K cells is scored incrementally: a
+#     window holding only one side's stones is worth 4**count to that side
+#
+# On boards larger than 5x5 only empty cells next to a stone are searched.
+#
+# search() can run on a worker thread: setting the optional `stop` event
+# aborts it within TIME_CHECK_NODES nodes (the best move of the last full
+# depth is still returned), and `progress` is called with a SearchResult
+# after every completed depth.  Pass a search_stats.SearchStats as `stats`
+# to count nodes, cut-offs, TT hits and time per depth.
+
+import math
+import random
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+WIN_SCORE = 1_000_000
+MAX_PLY = 400
+DEFAULT_BUDGET_MS = 1000
+TIME_CHECK_NODES = 1024
+FULL_WIDTH_UP_TO = 5
+MAX_TT_ENTRIES = 2_000_000
+
+EXACT, LOWER, UPPER = 0, 1, 2
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+SearchResult = namedtuple("SearchResult", "move score depth nodes elapsed_ms")
+
+
+class _Timeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def winning_lines(size, k):
+    """Every run of k cells on a size x size board: rows, cols, diagonals.
+
+    For 3x3 this is the same list, in the same order, as engine.WIN_LINES.
+    """
+    lines = []
+    for dr, dc in DIRECTIONS:
+        for r in range(size):
+            for c in range(size):
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < size and 0 <= end_c < size:
+                    lines.append(tuple((r + dr * i) * size + c + dc * i for i in range(k)))
+    return tuple(lines)
+
+
+class SearchEngine:
+    """Time-budgeted alpha-beta for a size x size board, k in a row to win."""
+
+    def __init__(self, size=3, k=3, seed=0):
+        self.size = size
+        self.k = k
+        n = size * size
+        self.n = n
+        self.lines = winning_lines(size, k)
+        self.cell_lines = [[] for _ in range(n)]
+        for li, line in enumerate(self.lines):
+            for c in line:
+                self.cell_lines[c].append(li)
+        # rays[c] = for each direction, the cells stepping forward and back
+        self.rays = [[(self._ray(c, dr, dc), self._ray(c, -dr, -dc)) for dr, dc in DIRECTIONS]
+                     for c in range(n)]
+        self.adjacent = [[r * size + cc
+                          for r in range(c // size - 1, c // size + 2)
+                          for cc in range(c % size - 1, c % size + 2)
+                          if 0 <= r < size and 0 <= cc < size and r * size + cc != c]
+                         for c in range(n)]
+        mid = (size - 1) / 2
+        by_centre = sorted(range(n), key=lambda c: (abs(c // size - mid) + abs(c % size - mid), c))
+        self.centre_rank = [0] * n
+        for rank, c in enumerate(by_centre):
+            self.centre_rank[c] = rank
+        self.weights = [0] + [4 ** i for i in range(1, k)] + [0]
+
+        rng = random.Random(seed)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(n)] for _ in range(3)]
+        self.side_key = rng.getrandbits(64)
+        self.tt = {}
+        self.tt_sides = None
+        self.history = [0] * n
+
+    def _ray(self, c, dr, dc):
+        r, cc = divmod(c, self.size)
+        out = []
+        for _ in range(self.k - 1):
+            r, cc = r + dr, cc + dc
+            if not (0 <= r < self.size and 0 <= cc < self.size):
+                break
+            out.append(r * self.size + cc)
+        return out
+
+    # ---------- board state ----------
+    def _setup(self, board, me, opp):
+        """Load a list-of-symbols board; player 1 = `me` (to move), 2 = `opp`."""
+        code = {"": 0, me: 1, opp: 2}
+        self.cells = [0] * self.n
+        self.counts = ([0] * len(self.lines), [0] * len(self.lines), [0] * len(self.lines))
+        self.near = [0] * self.n
+        self.score = 0
+        self.hash = 0
+        self.filled = 0
+        for c, v in enumerate(board):
+            if code[v]:
+                self._make(c, code[v])
+
+    def _line_value(self, li):
+        a, b = self.counts[1][li], self.counts[2][li]
+        if b == 0:
+            return self.weights[a]
+        if a == 0:
+            return -self.weights[b]
+        return 0
+
+    def _make(self, c, p):
+        for li in self.cell_lines[c]:
+            before = self._line_value(li)
+            self.counts[p][li] += 1
+            self.score += self._line_value(li) - before
+        for a in self.adjacent[c]:
+            self.near[a] += 1
+        self.cells[c] = p
+        self.hash ^= self.zobrist[p][c]
+        self.filled += 1
+
+    def _undo(self, c, p):
+        for li in self.cell_lines[c]:
+            before = self._line_value(li)
+            self.counts[p][li] -= 1
+            self.score += self._line_value(li) - before
+        for a in self.adjacent[c]:
+            self.near[a] -= 1
+        self.cells[c] = 0
+        self.hash ^= self.zobrist[p][c]
+        self.filled -= 1
+
+    def _is_win(self, c, p):
+        """Did the stone just placed at c complete a run of k for p?"""
+        cells = self.cells
+        for forward, back in self.rays[c]:
+            run = 1
+            for x in forward:
+                if cells[x] != p:
+                    break
+                run += 1
+            for x in back:
+                if cells[x] != p:
+                    break
+                run += 1
+            if run >= self.k:
+                return True
+        return False
+
+    def _candidates(self):
+        cells = self.cells
+        if self.size <= FULL_WIDTH_UP_TO or self.filled == 0:
+            moves = [c for c in range(self.n) if cells[c] == 0]
+            if self.filled == 0 and self.size > FULL_WIDTH_UP_TO:
+                moves = [min(moves, key=self.centre_rank.__getitem__)]
+            return moves
+        return [c for c in range(self.n) if cells[c] == 0 and self.near[c]]
+
+    def candidate_moves(self, board, me, opp):
+        """Empty cells the search would consider, centre first."""
+        self._setup(board, me, opp)
+        return sorted(self._candidates(), key=self.centre_rank.__getitem__)
+
+    def _ordered(self, moves, tt_move, ply):
+        killers = self.killers[ply]
+        history, centre = self.history, self.centre_rank
+
+        def key(m):
+            if m == tt_move:
+                return (0, 0, 0)
+            if m in killers:
+                return (1, killers.index(m), 0)
+            return (2, -history[m], centre[m])
+        return sorted(moves, key=key)
+
+    # ---------- search ----------
+    def search(self, board, me, opp, budget_ms=DEFAULT_BUDGET_MS, max_depth=None,
+               stop=None, progress=None, stats=None):
+        """Best move for `me` on `board` (list of "", me, opp) within budget_ms."""
+        start = time.perf_counter()
+        # table entries are stored by role (1 = side to move at the root)
+        if self.tt_sides != (me, opp) or len(self.tt) > MAX_TT_ENTRIES:
+            self.tt.clear()
+            self.tt_sides = (me, opp)
+        self._setup(board, me, opp)
+        self.deadline = start + budget_ms / 1000.0
+        self.stop = stop
+        self.stats = stats
+        self.nodes = 0
+        self.killers = [[] for _ in range(MAX_PLY + 1)]
+        self.history = [h // 2 for h in self.history]    # age old history
+
+        empty = self.n - self.filled
+        limit = min(empty, max_depth or empty)
+        best_move, best_score, reached = None, 0, 0
+        for depth in range(1, limit + 1):
+            self.timed = depth > 1               # depth 1 always completes
+            try:
+                score, move = self._root(depth, best_move)
+            except _Timeout:
+                break
+            best_move, best_score, reached = move, score, depth
+            if stats is not None:
+                stats.record_depth(depth, self.nodes)
+            if progress is not None:
+                progress(SearchResult(move, score, depth, self.nodes,
+                                      (time.perf_counter() - start) * 1000.0))
+            if abs(score) >= WIN_SCORE - MAX_PLY:
+                break                            # forced result found
+        if best_move is None:
+            moves = self._candidates()
+            best_move = moves[0] if moves else None
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if stats is not None:
+            stats.nodes += self.nodes
+            stats.finish()
+        return SearchResult(best_move, best_score, reached, self.nodes, elapsed)
+
+    def _root(self, depth, previous):
+        moves = self._ordered(self._candidates(), previous, 0)
+        alpha, beta = -math.inf, math.inf
+        best_score, best_move = -math.inf, None
+        for m in moves:
+            score = self._child(m, 1, depth, alpha, beta, 0)
+            if score > best_score:
+                best_score, best_move = score, m
+            alpha = max(alpha, score)
+        return best_score, best_move
+
+    def _child(self, m, p, depth, alpha, beta, ply):
+        """Score of playing m for p, from p's point of view."""
+        self._make(m, p)
+        try:
+            if self._is_win(m, p):
+                return WIN_SCORE - ply - 1
+            if self.filled == self.n:
+                return 0
+            return -self._negamax(depth - 1, -beta, -alpha, ply + 1, 3 - p)
+        finally:
+            self._undo(m, p)
+
+    def _negamax(self, depth, alpha, beta, ply, p):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_NODES == 0:
+            if self.stop is not None and self.stop.is_set():
+                raise _Timeout
+            if self.timed and time.perf_counter() > self.deadline:
+                raise _Timeout
+
+        key = self.hash ^ (self.side_key if p == 2 else 0)
+        entry = self.tt.get(key)
+        stats = self.stats
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        tt_move = None
+        if entry is not None:
+            e_depth, flag, e_score, tt_move = entry
+            if e_depth >= depth:
+                e_score = _from_tt(e_score, ply)
+                if flag == EXACT:
+                    return e_score
+                if flag == LOWER:
+                    alpha = max(alpha, e_score)
+                else:
+                    beta = min(beta, e_score)
+                if alpha >= beta:
+                    return e_score
+
+        if depth == 0:
+            return self.score if p == 1 else -self.score
+
+        moves = self._candidates()
+        if not moves:
+            return 0
+        alpha_orig = alpha
+        best, best_move = -math.inf, None
+        for m in self._ordered(moves, tt_move, ply):
+            score = self._child(m, p, depth, alpha, beta, ply)
+            if score > best:
+                best, best_move = score, m
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                killers = self.killers[ply]
+                if m not in killers:
+                    killers.insert(0, m)
+                    del killers[2:]
+                self.history[m] += depth * depth
+                break
+
+        flag = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+        self.tt[key] = (depth, flag, _to_tt(best, ply), best_move)
+        return best
+
+
+def _to_tt(score, ply):
+    # win scores are stored relative to the node, not the root
+    if score >= WIN_SCORE - MAX_PLY:
+        return score + ply
+    if score <= -(WIN_SCORE - MAX_PLY):
+        return score - ply
+    return score
+
+
+def _from_tt(score, ply):
+    if score >= WIN_SCORE - MAX_PLY:
+        return score - ply
+    if score <= -(WIN_SCORE - MAX_PLY):
+        return score + ply
+    return score
@@ -0,0 +1,45 @@
+# ----------------------- SEARCH STATISTICS -----------------------
+# Optional counters for minimax(), engine.negamax() and SearchEngine.search().
+# Every search takes `stats=None`; when left as None the only cost is an
+# `is not None` check at the counting sites.
+
+import time
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0          # alpha-beta cut-offs
+        self.tt_probes = 0
+        self.tt_hits = 0          # probes that returned a stored entry
+        self.max_depth = 0        # deepest ply / completed iteration reached
+        self.depths = []          # (depth, nodes so far, ms so far) per finished iteration
+        self.started = time.perf_counter()
+        self.elapsed_ms = 0.0
+
+    def finish(self):
+        self.elapsed_ms = (time.perf_counter() - self.started) * 1000.0
+        return self
+
+    def record_depth(self, depth, nodes):
+        self.max_depth = max(self.max_depth, depth)
+        self.depths.append((depth, nodes, (time.perf_counter() - self.started) * 1000.0))
+
+    @property
+    def nodes_per_s(self):
+        return self.nodes / (self.elapsed_ms / 1000.0) if self.elapsed_ms else 0.0
+
+    def as_dict(self):
+        return {"nodes": self.nodes, "cutoffs": self.cutoffs, "tt_probes": self.tt_probes,
+                "tt_hits": self.tt_hits, "max_depth": self.max_depth,
+                "elapsed_ms": self.elapsed_ms, "nodes_per_s": self.nodes_per_s,
+                "depths": [{"depth": d, "nodes": n, "ms": ms} for d, n, ms in self.depths]}
+
+    def summary(self):
+        hit_rate = self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+        lines = [f"nodes {self.nodes:,}  ·  {self.nodes_per_s:,.0f}/s  ·  {self.elapsed_ms:.1f} ms",
+                 f"cut-offs {self.cutoffs:,}  ·  TT hits {self.tt_hits:,}/{self.tt_probes:,} "
+                 f"({hit_rate:.0%})  ·  depth {self.max_depth}"]
+        if self.depths:
+            lines.append("  ".join(f"d{d}: {ms:.1f} ms" for d, _, ms in self.depths))
+        return "\n".join(lines)
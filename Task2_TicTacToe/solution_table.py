@@ -0,0 +1,97 @@
+# ----------------------- SOLUTION TABLE -----------------------
+# Every 3x3 position, solved once.  A position is indexed by its base-3 code
+# (square i contributes 3**i times 0 = empty, 1 = X, 2 = O) and owns 9 signed
+# bytes: the score of playing each square for the side to move (X moves when
+# both sides have the same number of stones), or NO_MOVE for occupied
+# squares, finished games and unreachable codes.  The 19683 x 9 bytes are
+# zlib-compressed into solution_table.bin.
+#
+#     python solution_table.py          # (re)generate the file
+#
+# The app loads it on first use; if the file is missing it is rebuilt from
+# engine.py in a few milliseconds.
+
+import array
+import os
+import zlib
+
+import engine
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solution_table.bin")
+N_CODES = 3 ** 9
+NO_MOVE = -128
+POW3 = tuple(3 ** i for i in range(9))
+DIGIT = {"": 0, "X": 1, "O": 2}
+
+_table = None
+
+
+def position_code(board):
+    return sum(DIGIT[v] * p for v, p in zip(board, POW3))
+
+
+def _board_of(code):
+    board = []
+    for _ in range(9):
+        code, d = divmod(code, 3)
+        board.append(("", "X", "O")[d])
+    return board
+
+
+def build():
+    """Solve every legal position; returns the flat array('b') table."""
+    table = array.array("b", [NO_MOVE]) * (N_CODES * 9)
+    for code in range(N_CODES):
+        board = _board_of(code)
+        x, o = board.count("X"), board.count("O")
+        if x - o not in (0, 1):
+            continue
+        mover, other = ("X", "O") if x == o else ("O", "X")
+        xb, ob = engine.to_bits(board, "X"), engine.to_bits(board, "O")
+        if engine.IS_WIN[xb] or engine.IS_WIN[ob]:
+            continue
+        for i, score in engine.move_scores(board, mover, other).items():
+            table[code * 9 + i] = score
+    return table
+
+
+def save(table, path=TABLE_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(zlib.compress(table.tobytes(), 9))
+    os.replace(tmp, path)
+
+
+def load(path=TABLE_PATH):
+    """The table, read (or rebuilt) on first call and kept in memory."""
+    global _table
+    if _table is None:
+        table = array.array("b")
+        try:
+            with open(path, "rb") as f:
+                table.frombytes(zlib.decompress(f.read()))
+        except (OSError, zlib.error):
+            table = array.array("b")
+        if len(table) != N_CODES * 9:
+            table = build()
+        _table = table
+    return _table
+
+
+def move_scores(board):
+    """{square: score} for the side to move, from the table."""
+    table = load()
+    start = position_code(board) * 9
+    row = table[start:start + 9]
+    return {i: s for i, s in enumerate(row) if s != NO_MOVE}
+
+
+def ranked_moves(board):
+    """Empty squares best first; equal scores keep the lower square first."""
+    scores = move_scores(board)
+    return sorted(scores, key=lambda i: (-scores[i], i))
+
+
+if __name__ == "__main__":
+    save(build())
+    print(f"Wrote {TABLE_PATH} ({os.path.getsize(TABLE_PATH):,} bytes)")
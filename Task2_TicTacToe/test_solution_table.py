@@ -0,0 +1,44 @@
+import array
+import zlib
+
+import engine
+import solution_table
+
+
+def shipped_table():
+    with open(solution_table.TABLE_PATH, "rb") as f:
+        return array.array("b", zlib.decompress(f.read()))
+
+
+def reachable_positions():
+    """Every non-final board reachable from the empty one, X to move first."""
+    seen, stack, boards = set(), [[""] * 9], []
+    while stack:
+        board = stack.pop()
+        code = solution_table.position_code(board)
+        if code in seen:
+            continue
+        seen.add(code)
+        xb, ob = engine.to_bits(board, "X"), engine.to_bits(board, "O")
+        if engine.IS_WIN[xb] or engine.IS_WIN[ob] or "" not in board:
+            continue
+        boards.append(board)
+        mover = "X" if board.count("X") == board.count("O") else "O"
+        for i in range(9):
+            if not board[i]:
+                stack.append(board[:i] + [mover] + board[i + 1:])
+    return boards
+
+
+def test_shipped_file_matches_build():
+    assert shipped_table() == solution_table.build()
+
+
+def test_table_agrees_with_engine(monkeypatch):
+    monkeypatch.setattr(solution_table, "_table", shipped_table())
+    boards = reachable_positions()
+    assert len(boards) == 4520
+    for board in boards:
+        mover, other = ("X", "O") if board.count("X") == board.count("O") else ("O", "X")
+        assert solution_table.move_scores(board) == engine.move_scores(board, mover, other)
+        assert solution_table.ranked_moves(board)[0] == engine.best_move(board, mover, other)
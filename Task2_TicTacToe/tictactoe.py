@@ -1,6 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import math, random
+import math
+import queue, threading
+
+import engine
+from engine import choose_move
+from search import SearchEngine, winning_lines
+from search_stats import SearchStats
 
 # ----------------------- THEME -----------------------
 BG = "#0f1220"           # page background
@@ -20,23 +26,33 @@ FONT_H2 = ("Segoe UI", 12, "bold")
 FONT_TXT = ("Segoe UI", 10)
 FONT_TILE = ("Segoe UI Semibold", 28, "bold")
 FONT_BADGE = ("Segoe UI", 10, "bold")
+FONT_MONO = ("Consolas", 9)
+
+# board label -> (size, stones in a row to win)
+BOARD_SIZES = {
+    "3×3 · 3 in a row": (3, 3),
+    "5×5 · 4 in a row": (5, 4),
+    "7×7 · 5 in a row": (7, 5),
+    "10×10 · 5 in a row": (10, 5),
+    "15×15 · Gomoku": (15, 5),
+}
+SEARCH_POLL_MS = 30
 
 
 # ----------------------- AI (Minimax + Alpha-Beta) -----------------------
-def check_winner(board):
-    wins = [
-        (0,1,2),(3,4,5),(6,7,8),         # rows
-        (0,3,6),(1,4,7),(2,5,8),         # cols
-        (0,4,8),(2,4,6)                  # diagonals
-    ]
-    for a,b,c in wins:
-        if board[a] != "" and board[a] == board[b] == board[c]:
-            return board[a], (a,b,c)     # ('X' or 'O', combo)
+def check_winner(board, size=3, k=3):
+    for line in winning_lines(size, k):
+        first = board[line[0]]
+        if first != "" and all(board[i] == first for i in line):
+            return first, line           # ('X' or 'O', combo)
     if "" not in board:
         return "Tie", None
     return None, None
 
-def minimax(board, depth, is_max, alpha, beta, ai, human):
+def minimax(board, depth, is_max, alpha, beta, ai, human, stats=None):
+    if stats is not None:
+        stats.nodes += 1
+        stats.max_depth = max(stats.max_depth, depth)
     winner, _ = check_winner(board)
     if winner == ai:
         return 10 - depth
@@ -50,11 +66,13 @@ def minimax(board, depth, is_max, alpha, beta, ai, human):
         for i in range(9):
             if board[i] == "":
                 board[i] = ai
-                score = minimax(board, depth+1, False, alpha, beta, ai, human)
+                score = minimax(board, depth+1, False, alpha, beta, ai, human, stats)
                 board[i] = ""
                 best = max(best, score)
                 alpha = max(alpha, best)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
                     break
         return best
     else:
@@ -62,26 +80,20 @@ def minimax(board, depth, is_max, alpha, beta, ai, human):
         for i in range(9):
             if board[i] == "":
                 board[i] = human
-                score = minimax(board, depth+1, True, alpha, beta, ai, human)
+                score = minimax(board, depth+1, True, alpha, beta, ai, human, stats)
                 board[i] = ""
                 best = min(best, score)
                 beta = min(beta, best)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
                     break
         return best
 
-def best_move(board, ai, human):
-    best_score = -math.inf
-    best_idx = None
-    for i in range(9):
-        if board[i] == "":
-            board[i] = ai
-            score = minimax(board, 0, False, -math.inf, math.inf, ai, human)
-            board[i] = ""
-            if score > best_score:
-                best_score = score
-                best_idx = i
-    return best_idx
+def best_move(board, ai, human, stats=None):
+    # same choice as maximising minimax() over the empty squares, but solved
+    # on bitboards with a symmetry-aware transposition table (see engine.py)
+    return engine.best_move(board, ai, human, stats)
 
 
 # ----------------------- APP -----------------------
@@ -95,6 +107,10 @@ class TicTacToeApp(tk.Tk):
         self.player = "X"
         self.ai = "O"
         self.turn = "X"                 # X starts
+        self.size, self.k = 3, 3
+        self.search_engine = None       # only for boards larger than 3x3
+        self.search_job = None          # (stop event, progress queue) of the running search
+        self.engine_lock = threading.Lock()
         self.board = [""]*9
         self.buttons = []
         self.pulse_job = None
@@ -103,7 +119,10 @@ class TicTacToeApp(tk.Tk):
 
         self.score = {"You":0, "AI":0, "Ties":0}
         self.difficulty = tk.StringVar(value="Impossible")  # Easy / Medium / Impossible
+        self.board_choice = tk.StringVar(value=next(iter(BOARD_SIZES)))
         self.status_var = tk.StringVar(value="Your turn (X)")
+        self.debug = tk.BooleanVar(value=False)
+        self.debug_var = tk.StringVar(value="Search stats appear after the AI's next move.")
 
         self._build_ui()
 
@@ -139,6 +158,15 @@ class TicTacToeApp(tk.Tk):
         btn_new.grid(row=0, column=3, padx=(8,12))
         panel.grid_columnconfigure(4, weight=1)
 
+        # Board size
+        tk.Label(panel, text="Board", bg=PANEL, fg=MUTED, font=FONT_TXT).grid(row=1, column=0, padx=(12,6), pady=(0,12), sticky="w")
+        size_box = ttk.Combobox(panel, textvariable=self.board_choice, values=list(BOARD_SIZES), state="readonly", width=18)
+        size_box.grid(row=1, column=1, columnspan=2, pady=(0,12), sticky="w")
+        size_box.bind("<<ComboboxSelected>>", lambda e: self.change_board_size())
+        tk.Checkbutton(panel, text="Debug stats", variable=self.debug, command=self._toggle_debug,
+                       bg=PANEL, fg=MUTED, selectcolor=BG, activebackground=PANEL,
+                       activeforeground=TXT, font=FONT_TXT).grid(row=1, column=3, pady=(0,12), sticky="w")
+
         # Scoreboard
         board_panel = tk.Frame(self, bg=PANEL)
         board_panel.pack(padx=16, pady=(8,16))
@@ -151,20 +179,10 @@ class TicTacToeApp(tk.Tk):
         self.score_ai.grid(row=0, column=1, padx=8, pady=12, sticky="nsew")
         self.score_tie.grid(row=0, column=2, padx=8, pady=12, sticky="nsew")
 
-        # Grid (3x3)
-        grid = tk.Frame(self, bg=BG)
-        grid.pack(padx=16, pady=(0,12))
-
-        for i in range(9):
-            btn = tk.Button(
-                grid, text="", width=4, height=2,
-                font=FONT_TILE, relief="flat",
-                bg=TILE_BG, fg=TXT, activebackground=TILE_ACTIVE,
-                command=lambda i=i: self.on_tile(i)
-            )
-            r, c = divmod(i, 3)
-            btn.grid(row=r, column=c, padx=8, pady=8, ipadx=8, ipady=8, sticky="nsew")
-            self.buttons.append(btn)
+        # Grid (size x size)
+        self.grid_frame = tk.Frame(self, bg=BG)
+        self.grid_frame.pack(padx=16, pady=(0,12))
+        self._build_grid()
 
         # Status bar
         status_bar = tk.Frame(self, bg=PANEL)
@@ -172,6 +190,32 @@ class TicTacToeApp(tk.Tk):
         self.status = tk.Label(status_bar, textvariable=self.status_var, bg=PANEL, fg=MUTED, font=FONT_H2, anchor="w")
         self.status.pack(fill="x", padx=12, pady=10)
 
+        # Debug panel (hidden until "Debug stats" is ticked)
+        self.debug_panel = tk.Frame(self, bg=PANEL)
+        tk.Label(self.debug_panel, textvariable=self.debug_var, bg=PANEL, fg=MUTED,
+                 font=FONT_MONO, justify="left", anchor="w").pack(fill="x", padx=12, pady=8)
+
+    def _build_grid(self):
+        for b in self.buttons:
+            b.destroy()
+        self.buttons = []
+        n = self.size
+        if n == 3:
+            font, width, height, pad, ipad = FONT_TILE, 4, 2, 8, 8
+        else:
+            font = ("Segoe UI Semibold", max(9, 60 // n), "bold")
+            width, height, pad, ipad = 2, 1, max(1, 8 // n), max(0, 12 // n)
+        for i in range(n * n):
+            btn = tk.Button(
+                self.grid_frame, text="", width=width, height=height,
+                font=font, relief="flat",
+                bg=TILE_BG, fg=TXT, activebackground=TILE_ACTIVE,
+                command=lambda i=i: self.on_tile(i)
+            )
+            r, c = divmod(i, n)
+            btn.grid(row=r, column=c, padx=pad, pady=pad, ipadx=ipad, ipady=ipad, sticky="nsew")
+            self.buttons.append(btn)
+
     def _style_ttk(self):
         style = ttk.Style()
         try:
@@ -201,20 +245,27 @@ class TicTacToeApp(tk.Tk):
         if self.board[idx] != "" or self.turn != self.player:
             return
         self._place(idx, self.player)
-        winner, combo = check_winner(self.board)
+        winner, combo = check_winner(self.board, self.size, self.k)
         if winner:
             self._finalize(winner, combo)
             return
         # AI turn
         self.turn = self.ai
         self.status_var.set("AI is thinking…")
-        self.after(450, self.ai_move)
+        # moves are table lookups, so no artificial thinking delay; after_idle
+        # lets the player's mark render first
+        self.after_idle(self.ai_move)
 
     def ai_move(self):
-        idx = self._choose_ai_move()
+        if self.search_engine is not None:
+            self._start_search()
+            return
+        self._play_ai_move(self._choose_ai_move())
+
+    def _play_ai_move(self, idx):
         if idx is not None:
             self._place(idx, self.ai)
-        winner, combo = check_winner(self.board)
+        winner, combo = check_winner(self.board, self.size, self.k)
         if winner:
             self._finalize(winner, combo)
         else:
@@ -222,19 +273,86 @@ class TicTacToeApp(tk.Tk):
             self.status_var.set("Your turn (X)")
 
     def _choose_ai_move(self):
-        empty = [i for i,v in enumerate(self.board) if v == ""]
-        if not empty:
-            return None
-        mode = self.difficulty.get()
-        if mode == "Easy":
-            # 80% random, 20% best
-            return random.choice(empty) if random.random() < 0.8 else best_move(self.board[:], self.ai, self.player)
-        elif mode == "Medium":
-            # 50% best, 50% random
-            return best_move(self.board[:], self.ai, self.player) if random.random() < 0.5 else random.choice(empty)
+        # 3x3: ranked lookups in the precomputed solution table
+        if self.debug.get():
+            self._show_debug_3x3()
+        return engine.choose_move(self.board, self.ai, self.player, self.difficulty.get())
+
+    # ---------- Debug stats ----------
+    def _toggle_debug(self):
+        if self.debug.get():
+            self.debug_panel.pack(padx=16, pady=(0,16), fill="x")
         else:
-            # Impossible = optimal
-            return best_move(self.board[:], self.ai, self.player)
+            self.debug_panel.pack_forget()
+
+    def _show_debug_3x3(self):
+        # the table needs no search, so compare what the two searchers would do
+        plain = SearchStats()
+        for i in range(9):
+            if self.board[i] == "":
+                board = self.board[:]
+                board[i] = self.ai
+                minimax(board, 0, False, -math.inf, math.inf, self.ai, self.player, plain)
+        plain.finish()
+        bitboard = SearchStats()
+        engine.move_scores(self.board, self.ai, self.player, bitboard)
+        self.debug_var.set("Move from solution table\n"
+                           f"minimax (list board)\n{plain.summary()}\n"
+                           f"bitboard negamax + TT\n{bitboard.summary()}")
+
+    # ---------- Background search (boards larger than 3x3) ----------
+    def _start_search(self):
+        self._cancel_search()
+        stop, updates = threading.Event(), queue.Queue()
+        self.search_job = (stop, updates)
+        worker = threading.Thread(
+            target=self._search_worker,
+            args=(self.search_engine, self.board[:], self.difficulty.get(), stop, updates,
+                  SearchStats() if self.debug.get() else None),
+            daemon=True)
+        worker.start()
+        self.after(SEARCH_POLL_MS, self._poll_search, stop, updates)
+
+    def _search_worker(self, searcher, board, mode, stop, updates, stats):
+        # runs off the Tk thread: only talks to the UI through `updates`;
+        # the lock keeps a cancelled search from overlapping the next one
+        with self.engine_lock:
+            if stop.is_set():
+                return
+            move = choose_move(board, self.ai, self.player, mode, searcher=searcher, stop=stop,
+                               progress=lambda r: updates.put(("progress", r)), stats=stats)
+            updates.put(("done", (move, stats)))
+
+    def _poll_search(self, stop, updates):
+        if self.search_job is None or self.search_job[0] is not stop:
+            return                      # cancelled or superseded
+        while True:
+            try:
+                kind, payload = updates.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self._show_search_progress(payload)
+            else:
+                move, stats = payload
+                self.search_job = None
+                if stats is not None:
+                    self.debug_var.set(f"Search ({self.size}×{self.size}, {self.k} in a row)\n"
+                                       + stats.summary())
+                self._play_ai_move(move)
+                return
+        self.after(SEARCH_POLL_MS, self._poll_search, stop, updates)
+
+    def _show_search_progress(self, r):
+        rate = r.nodes / (r.elapsed_ms / 1000.0) if r.elapsed_ms > 0 else 0.0
+        row, col = divmod(r.move, self.size)
+        self.status_var.set(f"AI is thinking… depth {r.depth} · {rate:,.0f} nodes/s · "
+                            f"best so far ({row + 1},{col + 1})")
+
+    def _cancel_search(self):
+        if self.search_job is not None:
+            self.search_job[0].set()
+            self.search_job = None
 
     def _place(self, idx, symbol):
         self.board[idx] = symbol
@@ -257,7 +375,7 @@ class TicTacToeApp(tk.Tk):
             self.score["Ties"] += 1
             self._update_score()
             # soft flash all tiles
-            self._pulse_tiles([i for i in range(9)], TIE)
+            self._pulse_tiles(list(range(len(self.board))), TIE)
             self.after(1200, self.restart_board)
             return
 
@@ -280,7 +398,7 @@ class TicTacToeApp(tk.Tk):
         # Pulse winning/tie tiles a couple of times
         def toggle():
             self.pulse_on = not self.pulse_on
-            for i in range(9):
+            for i in range(len(self.buttons)):
                 if i in indices:
                     self.buttons[i].config(bg=(color if self.pulse_on else TILE_BG))
                 else:
@@ -297,15 +415,26 @@ class TicTacToeApp(tk.Tk):
 
     # ---------- Controls ----------
     def restart_board(self):
+        self._cancel_search()
         # stop any pulse visuals
         self.pulse_on = False
         self.win_combo = None
-        self.board = [""]*9
+        self.board = [""]*(self.size * self.size)
         for b in self.buttons:
             b.config(text="", state="normal", bg=TILE_BG)
         self.turn = self.player
         self.status_var.set("Your turn (X)")
 
+    def change_board_size(self):
+        size, k = BOARD_SIZES[self.board_choice.get()]
+        if (size, k) == (self.size, self.k):
+            return
+        self._cancel_search()
+        self.size, self.k = size, k
+        self.search_engine = None if (size, k) == (3, 3) else SearchEngine(size, k)
+        self._build_grid()
+        self.restart_board()
+
     def reset_match(self):
         if messagebox.askyesno("Reset Match", "Reset scores and clear the board?"):
             self.score = {"You":0, "AI":0, "Ties":0}
@@ -0,0 +1,106 @@
+import numpy as np
+
+from collab_engine import top_indices
+
+# -----------------------------------
+# APPROXIMATE NEAREST NEIGHBOURS (random-projection LSH)
+# -----------------------------------
+# Each of `n_tables` tables hashes a vector to `n_bits` sign bits of random
+# projections; vectors with a small angle between them tend to share a
+# bucket.  A query looks up its own bucket in every table (plus `probes`
+# neighbouring buckets whose bit was closest to flipping), then ranks the
+# union of those candidates exactly.  Cost is driven by the bucket sizes,
+# not the catalogue size: with the default n_bits (chosen so a bucket holds
+# about BUCKET_TARGET vectors) query time grows roughly with log(n).
+#
+# More tables / probes  -> higher recall, slower queries.
+# More bits            -> smaller buckets, faster queries, lower recall.
+
+BUCKET_TARGET = 32
+MAX_BITS = 30
+DEFAULT_TABLES = 8
+DEFAULT_PROBES = 2
+DEFAULT_MAX_CANDIDATES = 2000
+
+
+def dense_unit(vectors):
+    """Dense float32 rows scaled to unit length (all-zero rows stay zero)."""
+    if hasattr(vectors, "toarray"):
+        vectors = vectors.toarray()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class LSHIndex:
+    """Cosine-similarity LSH over the rows of `vectors` (dense or sparse)."""
+
+    def __init__(self, vectors, n_tables=DEFAULT_TABLES, n_bits=None,
+                 probes=DEFAULT_PROBES, max_candidates=DEFAULT_MAX_CANDIDATES, seed=0):
+        self.vectors = dense_unit(vectors)
+        n, dim = self.vectors.shape
+        if n_bits is None:
+            n_bits = int(np.ceil(np.log2(max(n / BUCKET_TARGET, 2))))
+        self.n_tables = n_tables
+        self.n_bits = int(min(max(n_bits, 1), MAX_BITS))
+        self.probes = min(probes, self.n_bits)
+        self.max_candidates = max_candidates
+
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables, dim, self.n_bits)).astype(np.float32)
+        self._weights = np.left_shift(1, np.arange(self.n_bits, dtype=np.int64))
+
+        # per table: item rows sorted by bucket code, the distinct codes and
+        # where each code's run of rows starts (a CSR-like bucket layout)
+        self._order, self._codes, self._starts = [], [], []
+        for t in range(n_tables):
+            codes = (self.vectors @ self.planes[t] > 0) @ self._weights
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            distinct, starts = np.unique(codes[order], return_index=True)
+            self._order.append(order)
+            self._codes.append(distinct)
+            self._starts.append(np.append(starts, n))
+
+    def params(self):
+        return {"n_tables": self.n_tables, "n_bits": self.n_bits, "probes": self.probes,
+                "max_candidates": self.max_candidates}
+
+    def candidates(self, vector):
+        """Sorted row indices sharing a (probed) bucket with `vector`."""
+        found = []
+        for t in range(self.n_tables):
+            proj = vector @ self.planes[t]
+            code = int((proj > 0) @ self._weights)
+            probe_codes = [code]
+            # flip the bits whose projection was closest to the hyperplane
+            for b in np.argsort(np.abs(proj))[:self.probes].tolist():
+                probe_codes.append(code ^ (1 << b))
+            distinct = self._codes[t]
+            pos = np.searchsorted(distinct, probe_codes)
+            for p, c in zip(pos.tolist(), probe_codes):
+                if p < len(distinct) and distinct[p] == c:
+                    found.append(self._order[t][self._starts[t][p]:self._starts[t][p + 1]])
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        rows, hits = np.unique(np.concatenate(found), return_counts=True)
+        if len(rows) > self.max_candidates:
+            # keep the rows that collided in the most tables
+            rows = np.sort(rows[top_indices(hits.astype(np.float64), self.max_candidates)])
+        return rows
+
+    def query(self, vector, n, exclude=None):
+        """(rows, scores) of the approximately n most similar rows, best first.
+
+        May return fewer than n rows if the probed buckets are small.
+        """
+        vector = dense_unit(np.atleast_2d(vector))[0]
+        rows = self.candidates(vector)
+        if exclude is not None:
+            rows = rows[~np.isin(rows, exclude)]
+        scores = self.vectors[rows] @ vector
+        top = top_indices(scores.astype(np.float64), n)
+        return rows[top], scores[top]
+
+    def query_row(self, row, n):
+        """Neighbours of an indexed row, excluding the row itself."""
+        return self.query(self.vectors[row], n, exclude=[row])
@@ -0,0 +1,240 @@
+"""Build / load prebuilt recommender artifacts.
+
+    python artifacts.py build [--with-mf] [--out DIR]
+    python artifacts.py info [--out DIR]
+
+A build is a directory of plain .npy arrays plus manifest.json.  Loading
+memory-maps every array, so start-up cost is opening files and processes on
+the same machine share the page cache instead of each parsing the CSVs and
+rebuilding matrices.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csc_matrix, csr_matrix
+
+from collab_engine import CollaborativeEngine
+from content_index import GenreIndex, source_signature
+from loaders import print_progress
+from mf_model import ALSModel
+
+# -----------------------------------
+# LAYOUT
+# -----------------------------------
+#   <root>/CURRENT             name of the newest complete build
+#   <root>/<build>/manifest.json
+#   <root>/<build>/<array>.npy
+# A build is written to a temporary directory and published by atomically
+# replacing CURRENT, so readers never see a half-written build.
+
+FORMAT_VERSION = 1
+KEEP_BUILDS = 2
+
+
+def _save_sparse(out_dir, name, matrix, arrays):
+    for part in ("data", "indices", "indptr"):
+        key = f"{name}.{part}"
+        np.save(os.path.join(out_dir, key + ".npy"), getattr(matrix, part))
+        arrays[key] = {"shape": list(getattr(matrix, part).shape),
+                       "dtype": str(getattr(matrix, part).dtype)}
+    arrays[name] = {"format": matrix.format, "shape": list(matrix.shape)}
+
+
+def _save_dense(out_dir, name, array, arrays):
+    np.save(os.path.join(out_dir, name + ".npy"), array)
+    arrays[name] = {"shape": list(array.shape), "dtype": str(array.dtype)}
+
+
+def build_artifacts(rec, root, with_mf=False):
+    """Serialise everything `rec` needs to answer queries; returns the build dir."""
+    os.makedirs(root, exist_ok=True)
+    build = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+    tmp_dir = os.path.join(root, build + ".tmp")
+    os.makedirs(tmp_dir)
+
+    arrays = {}
+    movies = rec.movies
+    _save_dense(tmp_dir, "movie_ids", movies["movieId"].to_numpy(), arrays)
+    _save_dense(tmp_dir, "titles", movies["title"].to_numpy(dtype=str), arrays)
+    _save_dense(tmp_dir, "genres", movies["genres"].to_numpy(dtype=str), arrays)
+
+    index = rec.genre_index
+    _save_sparse(tmp_dir, "genre_matrix", index.matrix, arrays)
+    _save_dense(tmp_dir, "genre_neighbours", index.neighbours, arrays)
+    _save_dense(tmp_dir, "genre_scores", index.scores, arrays)
+
+    engine = rec.collab_engine
+    engine.compact()                 # fold in any ingested ratings
+    _save_sparse(tmp_dir, "ratings", engine.matrix, arrays)
+    _save_sparse(tmp_dir, "user_unit", engine.user_unit, arrays)
+    _save_sparse(tmp_dir, "item_unit", engine.item_unit, arrays)
+    _save_dense(tmp_dir, "user_ids", engine.user_ids, arrays)
+    _save_dense(tmp_dir, "item_ids", engine.item_ids, arrays)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "build": build,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "created_ns": time.time_ns(),
+        "sources": {
+            "movies.csv": source_signature(rec.movies_csv) if rec.movies_csv else None,
+            "ratings.csv": source_signature(rec.ratings_csv) if rec.ratings_csv else None,
+        },
+        "genre_index_signature": index.signature,
+        "mf": None,
+        "arrays": arrays,
+    }
+    if with_mf:
+        model = rec.mf_model
+        _save_dense(tmp_dir, "mf_user_factors", model.user_factors, arrays)
+        _save_dense(tmp_dir, "mf_item_factors", model.item_factors, arrays)
+        _save_dense(tmp_dir, "mf_user_ids", model.user_ids, arrays)
+        _save_dense(tmp_dir, "mf_item_ids", model.item_ids, arrays)
+        manifest["mf"] = {"params": model.params(), "global_mean": model.global_mean,
+                          "signature": model.signature}
+
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    build_dir = os.path.join(root, build)
+    os.rename(tmp_dir, build_dir)
+    current_tmp = os.path.join(root, "CURRENT.tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(build)
+    os.replace(current_tmp, os.path.join(root, "CURRENT"))
+    _prune(root, keep=KEEP_BUILDS)
+    return build_dir
+
+
+def _build_order(build_dir):
+    """Sort key for a build: its manifest's creation time, else the directory's."""
+    try:
+        with open(os.path.join(build_dir, "manifest.json"), encoding="utf-8") as f:
+            return int(json.load(f)["created_ns"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return os.stat(build_dir).st_mtime_ns
+
+
+def _prune(root, keep):
+    current = current_build(root)
+    builds = [os.path.join(root, d) for d in os.listdir(root)
+              if os.path.isdir(os.path.join(root, d)) and not d.endswith(".tmp")]
+    # directory names only have one-second resolution, so order by creation time
+    builds.sort(key=_build_order)
+    for old in builds[:-keep]:
+        if current is not None and os.path.samefile(old, current):
+            continue
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# -----------------------------------
+# LOADING
+# -----------------------------------
+def current_build(root):
+    """Directory of the newest published build, or None."""
+    try:
+        with open(os.path.join(root, "CURRENT"), encoding="utf-8") as f:
+            build_dir = os.path.join(root, f.read().strip())
+    except OSError:
+        return None
+    if not os.path.exists(os.path.join(build_dir, "manifest.json")):
+        return None
+    return build_dir
+
+
+def read_manifest(build_dir):
+    with open(os.path.join(build_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def is_fresh(manifest, movies_csv, ratings_csv):
+    """True if the build was made from the current CSV files."""
+    sources = manifest["sources"]
+    return (sources["movies.csv"] == source_signature(movies_csv)
+            and sources["ratings.csv"] == source_signature(ratings_csv))
+
+
+class ArtifactArrays:
+    """Memory-mapped view of one build's arrays."""
+
+    def __init__(self, build_dir, manifest, mmap=True):
+        self.build_dir = build_dir
+        self.manifest = manifest
+        self.mmap_mode = "r" if mmap else None
+
+    def dense(self, name):
+        return np.load(os.path.join(self.build_dir, name + ".npy"),
+                       mmap_mode=self.mmap_mode)
+
+    def sparse(self, name):
+        info = self.manifest["arrays"][name]
+        parts = tuple(self.dense(f"{name}.{p}") for p in ("data", "indices", "indptr"))
+        cls = csc_matrix if info["format"] == "csc" else csr_matrix
+        return cls(parts, shape=tuple(info["shape"]), copy=False)
+
+
+def load_components(build_dir, mmap=True):
+    """(movies, collab_engine, genre_index, mf_model or None) from a build."""
+    manifest = read_manifest(build_dir)
+    if manifest is None:
+        raise ValueError(f"{build_dir}: unsupported artifact format")
+    a = ArtifactArrays(build_dir, manifest, mmap=mmap)
+
+    titles = a.dense("titles")
+    movies = pd.DataFrame({"movieId": a.dense("movie_ids"), "title": titles,
+                           "genres": a.dense("genres")})
+    genre_index = GenreIndex(titles, a.dense("genre_neighbours"), a.dense("genre_scores"),
+                             matrix=a.sparse("genre_matrix"),
+                             signature=manifest["genre_index_signature"])
+    engine = CollaborativeEngine(a.sparse("ratings"), a.dense("user_ids"), a.dense("item_ids"),
+                                 user_unit=a.sparse("user_unit"),
+                                 item_unit=a.sparse("item_unit"))
+    mf_model = None
+    if manifest["mf"]:
+        mf = manifest["mf"]
+        mf_model = ALSModel.from_arrays(mf["params"], a.dense("mf_user_factors"),
+                                        a.dense("mf_item_factors"), a.dense("mf_user_ids"),
+                                        a.dense("mf_item_ids"), mf["global_mean"],
+                                        mf["signature"])
+    return movies, engine, genre_index, mf_model
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def main(argv=None):
+    from recommender import ARTIFACTS_DIR, DATA_DIR, Recommender
+
+    parser = argparse.ArgumentParser(description="Prebuilt recommender artifacts")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--out", default=ARTIFACTS_DIR)
+    parser.add_argument("--with-mf", action="store_true",
+                        help="train (or load) the ALS model and include its factors")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        rec = Recommender.from_csv(args.data_dir, progress=print_progress)
+        build_dir = build_artifacts(rec, args.out, with_mf=args.with_mf)
+        print(f"Built {build_dir} in {time.perf_counter() - start:.2f}s")
+        return
+
+    build_dir = current_build(args.out)
+    if build_dir is None:
+        print(f"No artifacts in {args.out}")
+        return
+    manifest = read_manifest(build_dir)
+    print(json.dumps({k: v for k, v in manifest.items() if k != "arrays"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
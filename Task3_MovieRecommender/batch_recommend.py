@@ -0,0 +1,158 @@
+"""Precompute top-N recommendations for every user (or every movie).
+
+Examples:
+    python batch_recommend.py --mode users --top-n 10 --out user_recs.csv
+    python batch_recommend.py --mode movies --out similar.parquet --workers 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from collab_engine import DEFAULT_NEIGHBOURS, top_indices
+from recommender import DATA_DIR, Recommender
+
+# -----------------------------------
+# WORKERS
+# -----------------------------------
+# The Recommender is built once in the parent.  With the "fork" start method
+# the children inherit its matrices copy-on-write, so the read-only CSR and
+# neighbour arrays are shared rather than rebuilt per process.  With "spawn"
+# each worker loads in _init_worker; if prebuilt artifacts exist they are
+# memory-mapped, so the workers still share the same pages.
+_worker_rec = None
+
+
+def _init_worker(data_dir):
+    global _worker_rec
+    if _worker_rec is None:
+        _worker_rec = Recommender.load(data_dir)
+
+
+def _users_chunk(args):
+    user_ids, top_n, k, strategy = args
+    rec = _worker_rec
+    if strategy == "mf":
+        results = _mf_many(rec, user_ids, top_n)
+    else:
+        results = rec.collab_engine.recommend_many(user_ids, top_n, k)
+    rows = []
+    for user_id, movie_ids in zip(user_ids, results):
+        for rank, movie_id in enumerate(movie_ids, start=1):
+            rows.append((user_id, rank, movie_id, rec.title_of.get(movie_id, "")))
+    return pd.DataFrame(rows, columns=["userId", "rank", "movieId", "title"])
+
+
+def _mf_many(rec, user_ids, top_n):
+    """Score a chunk of users against all items with one matrix product."""
+    engine, model = rec.collab_engine, rec.mf_model
+    rows = [model.user_row[int(u)] for u in user_ids]
+    scores = model.user_factors[rows] @ model.item_factors.T + model.global_mean
+    col_of = {int(m): j for j, m in enumerate(model.item_ids.tolist())}
+    for i, user_id in enumerate(user_ids):
+        seen = [col_of[m] for m in engine.rated_items(user_id).tolist() if m in col_of]
+        row = scores[i].astype(np.float64)
+        row[seen] = -np.inf
+        yield model.item_ids[top_indices(row, top_n)].tolist()
+
+
+def _movies_chunk(args):
+    rows_idx, top_n, _, _ = args
+    rec = _worker_rec
+    index = rec.genre_index
+    movie_ids = rec.movies["movieId"].to_numpy()
+    rows = []
+    for i in rows_idx:
+        if top_n <= index.k:
+            neighbours = index.neighbours[i, :top_n]
+        else:
+            neighbours = index.exact_neighbours(i)[:top_n]
+        for rank, j in enumerate(neighbours.tolist(), start=1):
+            rows.append((movie_ids[i], rank, movie_ids[j], index.titles[j]))
+    return pd.DataFrame(rows, columns=["movieId", "rank", "similarMovieId", "title"])
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# -----------------------------------
+# DRIVER
+# -----------------------------------
+def run_batch(rec, mode="users", top_n=10, k=DEFAULT_NEIGHBOURS, workers=None,
+              chunk_size=500, data_dir=DATA_DIR, strategy="knn"):
+    """Yield one DataFrame of recommendations per finished chunk."""
+    global _worker_rec
+    if mode == "users":
+        keys, task = rec.user_ids, _users_chunk
+    else:
+        keys, task = list(range(len(rec.movies))), _movies_chunk
+    jobs = [(chunk, top_n, k, strategy) for chunk in _chunks(keys, chunk_size)]
+    if mode == "users" and strategy == "mf":
+        rec.mf_model                 # train (or load) once, before forking
+
+    workers = workers or os.cpu_count() or 1
+    _worker_rec = rec
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield task(job)
+        return
+
+    method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+    ctx = mp.get_context(method)
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+        yield from pool.imap(task, jobs)
+
+
+def write_output(frames, out):
+    """Stream CSV chunks to disk; Parquet is written once at the end."""
+    total = 0
+    if out.endswith(".parquet"):
+        collected = []
+        for frame in frames:
+            collected.append(frame)
+            total += len(frame)
+        try:
+            pd.concat(collected, ignore_index=True).to_parquet(out, index=False)
+        except ImportError:
+            sys.exit("Writing Parquet needs pyarrow or fastparquet installed.")
+        return total
+
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        for i, frame in enumerate(frames):
+            frame.to_csv(f, index=False, header=(i == 0))
+            total += len(frame)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["users", "movies"], default="users")
+    parser.add_argument("--strategy", choices=["knn", "mf"], default="knn",
+                        help="users mode: nearest-neighbour or matrix factorization")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--neighbours", type=int, default=DEFAULT_NEIGHBOURS,
+                        help="similar users aggregated per recommendation")
+    parser.add_argument("--out", default="recommendations.csv",
+                        help="output file (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process count (default: all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rec = Recommender.load(args.data_dir)
+    frames = run_batch(rec, args.mode, args.top_n, args.neighbours, args.workers,
+                       args.chunk_size, args.data_dir, args.strategy)
+    rows = write_output(frames, args.out)
+    print(f"Wrote {rows} rows to {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
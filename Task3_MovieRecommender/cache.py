@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+# -----------------------------------
+# LRU RESULT CACHE
+# -----------------------------------
+# Query results are small (a handful of titles), so the cache is bounded by
+# entry count.  Keys carry the data version they were computed against:
+# after an ingest or a reload, old keys are simply never asked for again and
+# age out through normal LRU eviction.
+
+DEFAULT_SIZE = 1024
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded, thread-safe mapping with least-recently-used eviction."""
+
+    def __init__(self, maxsize=DEFAULT_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached value for `key`, calling compute() on a miss.
+
+        compute() runs outside the lock, so two threads missing on the same
+        key may both compute it; the later result wins.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._data), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,319 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+
+# -----------------------------------
+# SPARSE COLLABORATIVE FILTERING
+# -----------------------------------
+# The user x movie rating matrix is stored once as CSR.  A query only
+# touches the rows/columns it needs: similarities come from one sparse
+# matrix-vector product and candidates are scored with sparse ops over the
+# k most similar users (or over item-item cosine similarity).
+#
+# New ratings do not rebuild anything.  They are kept as a small sparse
+# overlay (new value - base value) on top of the base matrix, with the row and
+# column norms updated in place, and are folded into the base once the
+# overlay grows past COMPACT_AT entries.  The base itself may be a read-only
+# memory-mapped artifact.
+
+DEFAULT_NEIGHBOURS = 20
+COMPACT_AT = 20_000
+NEIGHBOUR_CACHE_SIZE = 10_000
+
+
+def top_indices(scores, n):
+    """Indices of the n largest finite scores, best first."""
+    valid = np.flatnonzero(np.isfinite(scores))
+    if len(valid) == 0 or n <= 0:
+        return valid[:0]
+    if len(valid) > n:
+        part = np.argpartition(-scores[valid], n - 1)[:n]
+        valid = valid[part]
+    order = np.lexsort((valid, -scores[valid]))
+    return valid[order]
+
+
+def _pad(matrix, shape):
+    """CSR view of `matrix` grown with empty rows/columns, sharing its data."""
+    if matrix.shape == shape:
+        return matrix
+    extra = shape[0] - matrix.shape[0]
+    indptr = np.concatenate([matrix.indptr,
+                             np.full(extra, matrix.indptr[-1], dtype=matrix.indptr.dtype)])
+    return csr_matrix((matrix.data, matrix.indices, indptr), shape=shape, copy=False)
+
+
+def _inverse(norms):
+    out = np.zeros_like(norms)
+    np.divide(1.0, norms, out=out, where=norms > 0)
+    return out
+
+
+class CollaborativeEngine:
+    def __init__(self, matrix, user_ids, item_ids, user_unit=None, item_unit=None):
+        self.user_ids = np.asarray(user_ids)
+        self.item_ids = np.asarray(item_ids)
+        self.user_row = {int(u): i for i, u in enumerate(self.user_ids.tolist())}
+        self.item_col = {int(m): j for j, m in enumerate(self.item_ids.tolist())}
+        self._set_base(csr_matrix(matrix, dtype=np.float32), user_unit, item_unit)
+        self.version = 0
+
+    def _set_base(self, matrix, user_unit=None, item_unit=None):
+        self.matrix = matrix
+        # row-normalised for user-user cosine, column-normalised for item-item
+        # (passed in when they were loaded from prebuilt artifacts)
+        if user_unit is None:
+            user_unit = normalize(matrix, norm="l2", axis=1)
+        if item_unit is None:
+            item_unit = normalize(matrix, norm="l2", axis=0)
+        self.user_unit = user_unit.tocsr()
+        self.item_unit = item_unit.tocsc()
+
+        self._pending = {}            # (row, col) -> (rating, base value)
+        self._delta = None            # sparse (new - base) for _pending
+        self._user_sq = None          # squared norms, computed on first update
+        self._item_sq = None
+        self._neighbour_cache = {}
+
+    @classmethod
+    def from_frame(cls, ratings):
+        # pivot_table averaged duplicate (user, movie) pairs; keep that
+        grouped = ratings.groupby(["userId", "movieId"], sort=False)["rating"].mean()
+        users = grouped.index.get_level_values(0).to_numpy()
+        items = grouped.index.get_level_values(1).to_numpy()
+
+        user_ids, rows = np.unique(users, return_inverse=True)
+        item_ids, cols = np.unique(items, return_inverse=True)
+        matrix = csr_matrix(
+            (grouped.to_numpy(dtype=np.float32), (rows, cols)),
+            shape=(len(user_ids), len(item_ids)),
+        )
+        return cls(matrix, user_ids, item_ids)
+
+    @property
+    def shape(self):
+        return len(self.user_ids), len(self.item_ids)
+
+    def has_user(self, user_id):
+        return int(user_id) in self.user_row
+
+    # ---------- effective ratings (base + overlay) ----------
+    def user_rows(self, rows):
+        """Effective ratings of the given user rows as CSR."""
+        base = _pad(self.matrix, self.shape)[rows]
+        if self._delta is None:
+            return base
+        return (base + self._delta[rows]).tocsr()
+
+    def ratings_matrix(self):
+        """Effective users x items rating matrix, including ingested ratings."""
+        base = _pad(self.matrix, self.shape)
+        if self._delta is None:
+            return base
+        merged = (base + self._delta).tocsr()
+        merged.eliminate_zeros()
+        return merged
+
+    def rated_items(self, user_id):
+        """Movie ids user_id has rated."""
+        u = self.user_row[int(user_id)]
+        return self.item_ids[self.user_rows([u]).indices]
+
+    # ---------- user-user ----------
+    def _user_sims(self, u):
+        """Cosine similarity of user row u to every user row."""
+        if self._delta is None:
+            return (self.user_unit @ self.user_unit[u].T).toarray().ravel()
+        q = self.user_rows([u]).T
+        dots = (_pad(self.matrix, self.shape) @ q + self._delta @ q).toarray().ravel()
+        inv = _inverse(np.sqrt(self._user_sq))
+        return dots * inv * inv[u]
+
+    def similar_users(self, user_id, k=DEFAULT_NEIGHBOURS):
+        """(rows, similarities) of the k users closest to user_id."""
+        u = self.user_row[int(user_id)]
+        cached = self._neighbour_cache.get((u, k))
+        if cached is not None:
+            return cached
+
+        sims = self._user_sims(u).astype(np.float64)
+        sims[u] = -np.inf
+        sims[sims <= 0] = -np.inf            # no co-rated movies, no signal
+        rows = top_indices(sims, k)
+        result = rows, sims[rows].astype(np.float32)
+
+        if len(self._neighbour_cache) >= NEIGHBOUR_CACHE_SIZE:
+            self._neighbour_cache.pop(next(iter(self._neighbour_cache)))
+        self._neighbour_cache[(u, k)] = result
+        return result
+
+    def recommend(self, user_id, top_n=5, k=DEFAULT_NEIGHBOURS):
+        """Movie ids for user_id from its k nearest users, or None if unknown."""
+        if not self.has_user(user_id):
+            return None
+        u = self.user_row[int(user_id)]
+        rows, sims = self.similar_users(user_id, k)
+        return self._vote(u, rows, sims, top_n)
+
+    def recommend_many(self, user_ids, top_n=5, k=DEFAULT_NEIGHBOURS):
+        """recommend() for a batch of known users with one sparse product.
+
+        Yields one list of movie ids per user, in input order.
+        """
+        if self._delta is not None:
+            for user_id in user_ids:
+                yield self.recommend(user_id, top_n, k)
+            return
+
+        users = [self.user_row[int(u)] for u in user_ids]
+        block = (self.user_unit[users] @ self.user_unit.T).tocsr()
+        block.sort_indices()
+        for i, u in enumerate(users):
+            start, stop = block.indptr[i], block.indptr[i + 1]
+            cand = block.indices[start:stop]
+            sims = block.data[start:stop].astype(np.float64)
+            keep = (cand != u) & (sims > 0)
+            cand, sims = cand[keep], sims[keep]
+            top = top_indices(sims, k)
+            yield self._vote(u, cand[top], sims[top].astype(np.float32), top_n)
+
+    def _vote(self, u, rows, sims, top_n):
+        if len(rows) == 0:
+            return []
+        # similarity-weighted vote: sum over neighbours of sim * rating
+        weighted = np.asarray(self.user_rows(rows).T @ sims, dtype=np.float64).ravel()
+        scores = np.where(weighted > 0, weighted, -np.inf)
+        return self._finish(u, scores, top_n)
+
+    # ---------- item-item ----------
+    def similar_items(self, movie_id, top_n=5):
+        """Movie ids most similar to movie_id by co-rating cosine."""
+        j = self.item_col.get(int(movie_id))
+        if j is None:
+            return None
+        if self._delta is None:
+            sims = (self.item_unit.T @ self.item_unit[:, j]).toarray().ravel()
+        else:
+            effective = self.ratings_matrix()
+            inv = _inverse(np.sqrt(self._item_sq))
+            sims = (effective.T @ effective[:, [j]]).toarray().ravel() * inv * inv[j]
+        sims = sims.astype(np.float64)
+        sims[j] = -np.inf
+        sims[sims <= 0] = -np.inf
+        return self.item_ids[top_indices(sims, top_n)].tolist()
+
+    def recommend_item_based(self, user_id, top_n=5):
+        """Movie ids scored by item-item similarity to what user_id rated."""
+        if not self.has_user(user_id):
+            return None
+        u = self.user_row[int(user_id)]
+        # score_j = sum_i sim(j, i) * r_ui, as two sparse mat-vec products
+        if self._delta is None:
+            profile = self.item_unit @ self.matrix[u].T
+            scores = (self.item_unit.T @ profile).toarray().ravel()
+        else:
+            effective = self.ratings_matrix()
+            inv = _inverse(np.sqrt(self._item_sq))
+            y = self.user_rows([u]).multiply(inv).tocsr().T
+            scores = (effective.T @ (effective @ y)).toarray().ravel() * inv
+        scores = scores.astype(np.float64)
+        scores[scores <= 0] = -np.inf
+        return self._finish(u, scores, top_n)
+
+    def _finish(self, u, scores, top_n):
+        scores[self.user_rows([u]).indices] = -np.inf   # already rated
+        return self.item_ids[top_indices(scores, top_n)].tolist()
+
+    # ---------- incremental updates ----------
+    def add_ratings(self, records):
+        """Add or overwrite (userId, movieId, rating) triples.
+
+        New users and movies are appended.  Returns the ids of the changed
+        users plus any cached users whose neighbour lists were invalidated.
+        """
+        records = list(records)
+        if not records:
+            return set()
+        if self._user_sq is None:
+            squared = self.matrix.multiply(self.matrix)
+            self._user_sq = np.asarray(squared.sum(axis=1), dtype=np.float64).ravel()
+            self._item_sq = np.asarray(squared.sum(axis=0), dtype=np.float64).ravel()
+
+        touched = set()
+        for user_id, movie_id, rating in records:
+            u = self._ensure_user(int(user_id))
+            j = self._ensure_item(int(movie_id))
+            rating = float(rating)
+            if (u, j) in self._pending:
+                old, base = self._pending[(u, j)]
+            else:
+                old = base = self._base_value(u, j)
+            self._user_sq[u] += rating * rating - old * old
+            self._item_sq[j] += rating * rating - old * old
+            self._pending[(u, j)] = (rating, base)
+            touched.add(u)
+
+        keys = np.array(list(self._pending), dtype=np.int64).reshape(-1, 2)
+        values = np.fromiter((new - base for new, base in self._pending.values()),
+                             dtype=np.float32, count=len(self._pending))
+        self._delta = csr_matrix((values, (keys[:, 0], keys[:, 1])), shape=self.shape)
+        self.version += 1
+
+        affected = self._invalidate(touched)
+        if len(self._pending) > COMPACT_AT:
+            self.compact()
+        return affected
+
+    def compact(self):
+        """Fold the overlay into the base matrix and rebuild the unit copies."""
+        if self._delta is None:
+            return
+        merged = self.ratings_matrix().astype(np.float32)
+        merged.sort_indices()
+        self._set_base(merged)
+
+    def _invalidate(self, users):
+        """Drop cached neighbour lists that the changed users can affect.
+
+        A user's similarity to u changes only if they share a rated movie,
+        i.e. if they have a non-zero dot product with u's row.  Only users
+        with a cached list are checked.
+        """
+        affected = set(users)
+        cached = np.array(sorted({key[0] for key in self._neighbour_cache}), dtype=np.int64)
+        if len(cached):
+            cached_rows = self.user_rows(cached)
+            for u in users:
+                dots = cached_rows @ self.user_rows([u]).T
+                affected.update(cached[dots.nonzero()[0]].tolist())
+            self._neighbour_cache = {key: v for key, v in self._neighbour_cache.items()
+                                     if key[0] not in affected}
+        return {int(self.user_ids[u]) for u in affected}
+
+    def _base_value(self, u, j):
+        if u >= self.matrix.shape[0] or j >= self.matrix.shape[1]:
+            return 0.0
+        start, stop = self.matrix.indptr[u], self.matrix.indptr[u + 1]
+        cols = self.matrix.indices[start:stop]
+        pos = np.searchsorted(cols, j)
+        if pos < len(cols) and cols[pos] == j:
+            return float(self.matrix.data[start + pos])
+        return 0.0
+
+    def _ensure_user(self, user_id):
+        u = self.user_row.get(user_id)
+        if u is None:
+            u = len(self.user_ids)
+            self.user_row[user_id] = u
+            self.user_ids = np.append(self.user_ids, user_id)
+            self._user_sq = np.append(self._user_sq, 0.0)
+        return u
+
+    def _ensure_item(self, movie_id):
+        j = self.item_col.get(movie_id)
+        if j is None:
+            j = len(self.item_ids)
+            self.item_col[movie_id] = j
+            self.item_ids = np.append(self.item_ids, movie_id)
+            self._item_sq = np.append(self._item_sq, 0.0)
+        return j
@@ -0,0 +1,193 @@
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from ann import LSHIndex
+from loaders import read_movies_csv
+
+# -----------------------------------
+# GENRE SIMILARITY INDEX
+# -----------------------------------
+# Cosine similarity between genre vectors is computed once, block by block,
+# and only the K nearest neighbours of every movie are kept.  Queries then
+# read a precomputed row instead of rebuilding an N x N matrix per click.
+#
+# For very large catalogues the exact build is quadratic; passing `ann`
+# (LSHIndex parameters, see ann.py) finds each movie's neighbours from its
+# LSH buckets instead, trading a little recall for a sub-quadratic build.
+
+INDEX_VERSION = 1
+DEFAULT_K = 50
+BLOCK_ROWS = 256
+
+
+def split_genres(genres):
+    return genres.split("|")
+
+
+def source_signature(path):
+    """Cheap change detector for a data file: size + modification time."""
+    st = os.stat(path)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def genre_matrix(genres):
+    """L2-normalised sparse genre vectors (rows are movies)."""
+    cv = CountVectorizer(tokenizer=split_genres, token_pattern=None)
+    matrix = cv.fit_transform(genres).astype(np.float32)
+    return normalize(matrix, norm="l2", copy=False).tocsr()
+
+
+def _top_k_rows(sim, k, row_offset):
+    """Top-k columns of every row of a dense similarity block.
+
+    Ties are broken by the lower column index, which is the order the
+    original sorted() over enumerate() produced.
+    """
+    rows = np.arange(sim.shape[0])
+    sim[rows, rows + row_offset] = -np.inf          # never recommend itself
+
+    n = sim.shape[1]
+    kth = np.partition(sim, n - k, axis=1)[:, n - k][:, None]
+    greater = sim > kth
+    need = k - greater.sum(axis=1, keepdims=True)
+    equal = sim == kth
+    selected = greater | (equal & (np.cumsum(equal, axis=1) <= need))
+
+    cols = np.nonzero(selected)[1].reshape(sim.shape[0], k)
+    scores = np.take_along_axis(sim, cols, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return (np.take_along_axis(cols, order, axis=1).astype(np.int32),
+            np.take_along_axis(scores, order, axis=1).astype(np.float32))
+
+
+def _ann_neighbours(lsh, matrix, k, neighbours, scores):
+    """Fill neighbours/scores row by row from LSH candidates.
+
+    Rows whose buckets hold fewer than k other movies are topped up with the
+    lowest-index remaining movies, as the exact build would rank zero-score
+    movies.
+    """
+    n = matrix.shape[0]
+    for i in range(n):
+        rows, sims = lsh.query_row(i, k)
+        if len(rows) < k:
+            filler = np.setdiff1d(np.arange(min(n, 2 * k + 1)), np.append(rows, i))
+            filler = filler[:k - len(rows)]
+            fill_sims = (matrix[filler] @ matrix[i].T).toarray().ravel()
+            rows = np.concatenate([rows, filler])
+            sims = np.concatenate([sims, fill_sims])
+            order = np.lexsort((np.arange(len(rows)), -sims))
+            rows, sims = rows[order], sims[order]
+        neighbours[i] = rows
+        scores[i] = sims
+
+
+class GenreIndex:
+    def __init__(self, titles, neighbours, scores, matrix=None, signature=None):
+        self.titles = np.asarray(titles)
+        self.neighbours = neighbours
+        self.scores = scores
+        self.matrix = matrix
+        self.signature = signature
+        self.k = neighbours.shape[1]
+        # first occurrence wins, like movies[movies["title"] == t].index[0]
+        self.row_of = {}
+        for i, t in enumerate(self.titles.tolist()):
+            self.row_of.setdefault(t, i)
+
+    @classmethod
+    def build(cls, movies, k=DEFAULT_K, signature=None, ann=None):
+        titles = movies["title"].astype(str).to_numpy()
+        matrix = genre_matrix(movies["genres"].astype(str))
+        n = matrix.shape[0]
+        k = max(0, min(k, n - 1))
+
+        neighbours = np.empty((n, k), dtype=np.int32)
+        scores = np.empty((n, k), dtype=np.float32)
+        if ann is not None and k:
+            _ann_neighbours(LSHIndex(matrix, **ann), matrix, k, neighbours, scores)
+            return cls(titles, neighbours, scores, matrix=matrix, signature=signature)
+
+        matrix_t = matrix.T.tocsc()
+        for start in range(0, n if k else 0, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, n)
+            block = (matrix[start:stop] @ matrix_t).toarray()
+            neighbours[start:stop], scores[start:stop] = _top_k_rows(block, k, start)
+
+        return cls(titles, neighbours, scores, matrix=matrix, signature=signature)
+
+    # ---------- persistence ----------
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, version=INDEX_VERSION, titles=self.titles.astype(str),
+                 neighbours=self.neighbours, scores=self.scores,
+                 signature=str(self.signature or ""),
+                 data=self.matrix.data, indices=self.matrix.indices,
+                 indptr=self.matrix.indptr, shape=np.array(self.matrix.shape))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            if int(f["version"]) != INDEX_VERSION:
+                return None
+            matrix = csr_matrix((f["data"], f["indices"], f["indptr"]),
+                                shape=tuple(f["shape"]))
+            return cls(f["titles"], f["neighbours"], f["scores"], matrix=matrix,
+                       signature=str(f["signature"]) or None)
+
+    @classmethod
+    def load_or_build(cls, movies_csv, cache_path, movies=None, k=DEFAULT_K, ann=None):
+        """Load the cached index, rebuilding it only if movies.csv changed."""
+        signature = cls._signature(movies_csv, k, ann)
+        if os.path.exists(cache_path):
+            try:
+                index = cls.load(cache_path)
+            except (OSError, ValueError, KeyError):
+                index = None
+            if index is not None and index.signature == signature:
+                return index
+
+        if movies is None:
+            movies = read_movies_csv(movies_csv)
+        index = cls.build(movies, k=k, signature=signature, ann=ann)
+        index.save(cache_path)
+        return index
+
+    @staticmethod
+    def _signature(movies_csv, k, ann=None):
+        signature = f"{source_signature(movies_csv)}-k{k}"
+        if ann is not None:
+            signature += "-lsh" + "".join(f"-{key}{ann[key]}" for key in sorted(ann))
+        return signature
+
+    def is_current(self, movies_csv, k=DEFAULT_K, ann=None):
+        return self.signature == self._signature(movies_csv, k, ann)
+
+    # ---------- queries ----------
+    def similar(self, movie_title, top_n=5):
+        """Titles most similar to movie_title, or None if it is unknown."""
+        idx = self.row_of.get(movie_title)
+        if idx is None:
+            return None
+
+        if top_n <= self.k:
+            rows = self.neighbours[idx, :top_n]
+        else:
+            rows = self.exact_neighbours(idx)[:top_n]
+
+        results = self.titles[rows].tolist()
+        # remove exact same movie if the catalogue repeats a title
+        return [m for m in results if m != movie_title]
+
+    def exact_neighbours(self, idx):
+        """Full ranking for one movie, used when top_n exceeds the stored K."""
+        row = (self.matrix @ self.matrix[idx].T).toarray().ravel()
+        row[idx] = -np.inf
+        order = np.argsort(-row, kind="stable")
+        return order[:-1]
@@ -0,0 +1,428 @@
+"""Offline quality and speed evaluation for the movie recommenders.
+
+Examples:
+    python evaluate.py                                   # bundled CSVs
+    python evaluate.py --split random --k 5 --strategies knn,mf
+    python evaluate.py --synthetic 100,1000,10000,100000 --json scaling.json
+    python evaluate.py --ann 10000,100000,1000000          # LSH vs exact
+
+For every strategy it reports precision@K, recall@K, NDCG@K, catalogue
+coverage, build time, per-query latency percentiles, throughput and its own
+peak memory (tracemalloc peak of its build and of its queries).  --synthetic
+generates MovieLens-shaped data of the given user counts so the numbers can
+be charted against scale.  --ann instead compares the LSH index (ann.py)
+with exact search over genre and latent vectors: recall against the exact
+top K and query latency of both, per catalogue size.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from ann import LSHIndex, dense_unit
+from collab_engine import CollaborativeEngine, top_indices
+from content_index import GenreIndex, genre_matrix
+from mf_model import ALSModel
+from recommender import DATA_DIR, MF_PARAMS, load_movies
+
+try:
+    import resource
+except ImportError:          # Windows
+    resource = None
+
+STRATEGIES = ["popular", "content", "knn", "item", "mf"]
+MEMORY_SAMPLE = 200      # users whose queries are re-run under tracemalloc
+# (n_tables, probes) settings compared by --ann, cheapest first
+ANN_CONFIGS = [(4, 0), (8, 2), (16, 4)]
+
+
+# -----------------------------------
+# SPLITS
+# -----------------------------------
+def random_split(ratings, test_fraction=0.2, seed=0):
+    """Hold out a random fraction of all ratings."""
+    rng = np.random.default_rng(seed)
+    test_mask = rng.random(len(ratings)) < test_fraction
+    return ratings[~test_mask], ratings[test_mask]
+
+
+def leave_last_out(ratings):
+    """Hold out each user's last rating (by timestamp, else file order).
+
+    Users with a single rating stay entirely in train.
+    """
+    if "timestamp" in ratings.columns:
+        ratings = ratings.sort_values(["userId", "timestamp"], kind="stable")
+    else:
+        ratings = ratings.sort_values("userId", kind="stable")
+    per_user = ratings.groupby("userId")["movieId"]
+    test_mask = (per_user.cumcount(ascending=False) == 0) & (per_user.transform("size") > 1)
+    return ratings[~test_mask], ratings[test_mask]
+
+
+# -----------------------------------
+# METRICS
+# -----------------------------------
+def ranking_metrics(recommended, relevant, k):
+    """precision@k, recall@k and binary NDCG@k for one user."""
+    recommended = recommended[:k]
+    hits = [1.0 if m in relevant else 0.0 for m in recommended]
+    n_hits = sum(hits)
+    dcg = sum(h / np.log2(i + 2) for i, h in enumerate(hits))
+    ideal = sum(1.0 / np.log2(i + 2) for i in range(min(len(relevant), k)))
+    return n_hits / k, n_hits / len(relevant), (dcg / ideal if ideal else 0.0)
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p90, p99 = np.percentile(samples_ms, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99),
+            "max": float(max(samples_ms))}
+
+
+def traced(fn, *args):
+    """(fn(*args), peak MB allocated while it ran), via tracemalloc.
+
+    Unlike ru_maxrss this is per call, so each strategy gets its own peak.
+    """
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# -----------------------------------
+# STRATEGIES (user -> ranked movie ids)
+# -----------------------------------
+def _content_query(engine, index, movies, seed_of):
+    """Content-based recommendations seeded by the user's favourite movie."""
+    movie_ids = movies["movieId"].to_numpy()
+    movie_row = {int(m): i for i, m in enumerate(movie_ids.tolist())}
+
+    def query(user_id, k):
+        row = movie_row.get(seed_of.get(user_id))
+        if row is None:
+            return []
+        seen = set(engine.rated_items(user_id).tolist())
+        candidates = index.neighbours[row] if k <= index.k else index.exact_neighbours(row)
+        out = []
+        for j in candidates.tolist():
+            m = int(movie_ids[j])
+            if m not in seen:
+                out.append(m)
+                if len(out) == k:
+                    break
+        return out
+    return query
+
+
+def make_queries(engine, genre_index, mf_model, movies, train):
+    """strategy name -> query(user_id, k) returning ranked movie ids."""
+    popularity = train.groupby("movieId").size().sort_values(ascending=False, kind="stable")
+    popular_ids = popularity.index.to_numpy()
+
+    def popular(user_id, k):
+        seen = set(engine.rated_items(user_id).tolist())
+        return [int(m) for m in popular_ids[:k + len(seen)] if m not in seen][:k]
+
+    best = train.sort_values("rating", ascending=False, kind="stable")
+    seed_of = best.drop_duplicates("userId").set_index("userId")["movieId"].to_dict()
+
+    def mf(user_id, k):
+        return mf_model.recommend(user_id, top_n=k, exclude_items=engine.rated_items(user_id))
+
+    return {
+        "popular": popular,
+        "content": _content_query(engine, genre_index, movies, seed_of),
+        "knn": lambda user_id, k: engine.recommend(user_id, top_n=k),
+        "item": lambda user_id, k: engine.recommend_item_based(user_id, top_n=k),
+        "mf": mf,
+    }
+
+
+# -----------------------------------
+# HARNESS
+# -----------------------------------
+def evaluate(movies, ratings, strategies=STRATEGIES, split="leave-last-out", k=10,
+             relevant_threshold=4.0, max_users=None, seed=0, mf_params=None):
+    """Train on a split of `ratings` and score every strategy on the rest."""
+    if split == "random":
+        train, test = random_split(ratings, seed=seed)
+    else:
+        train, test = leave_last_out(ratings)
+
+    # builds run under tracemalloc (a few % slower for these numpy-heavy steps)
+    start = time.perf_counter()
+    (engine, genre_index), base_peak = traced(
+        lambda: (CollaborativeEngine.from_frame(train), GenreIndex.build(movies)))
+    base_build = time.perf_counter() - start
+
+    mf_model, mf_build, mf_peak = None, 0.0, 0.0
+    if "mf" in strategies:
+        def fit_mf():
+            model = ALSModel(**dict(MF_PARAMS, **(mf_params or {})))
+            return model.fit(engine.ratings_matrix(), engine.user_ids, engine.item_ids)
+        start = time.perf_counter()
+        mf_model, mf_peak = traced(fit_mf)
+        mf_build = time.perf_counter() - start
+
+    relevant = test[test["rating"] >= relevant_threshold]
+    relevant = relevant[relevant["userId"].isin(engine.user_row)]
+    truth = relevant.groupby("userId")["movieId"].apply(set).to_dict()
+    users = sorted(truth)
+    if max_users and len(users) > max_users:
+        rng = np.random.default_rng(seed)
+        users = sorted(rng.choice(users, max_users, replace=False).tolist())
+
+    queries = make_queries(engine, genre_index, mf_model, movies, train)
+    results = {
+        "dataset": {"users": len(engine.user_ids), "movies": len(movies),
+                    "ratings": len(ratings), "train": len(train), "test": len(test),
+                    "evaluated_users": len(users), "split": split, "k": k},
+        "strategies": {},
+    }
+    memory_users = users[:MEMORY_SAMPLE]
+    for name in strategies:
+        query = queries[name]
+        build = base_build + (mf_build if name == "mf" else 0.0)
+        latencies, precision, recall, ndcg = [], [], [], []
+        recommended_items = set()
+        wall = time.perf_counter()
+        for user_id in users:
+            t0 = time.perf_counter()
+            recs = query(user_id, k) or []
+            latencies.append((time.perf_counter() - t0) * 1e3)
+            p, r, n = ranking_metrics(recs, truth[user_id], k)
+            precision.append(p)
+            recall.append(r)
+            ndcg.append(n)
+            recommended_items.update(recs)
+        wall = time.perf_counter() - wall
+        _, query_peak = traced(lambda: [query(u, k) for u in memory_users])
+
+        results["strategies"][name] = {
+            f"precision@{k}": float(np.mean(precision)) if users else 0.0,
+            f"recall@{k}": float(np.mean(recall)) if users else 0.0,
+            f"ndcg@{k}": float(np.mean(ndcg)) if users else 0.0,
+            "coverage": len(recommended_items) / max(1, len(movies)),
+            "build_s": build,
+            "latency_ms": percentiles(latencies),
+            "queries_per_s": len(users) / wall if wall > 0 else 0.0,
+            "build_peak_mb": mf_peak if name == "mf" else base_peak,
+            "query_peak_mb": query_peak,
+        }
+    results["dataset"]["process_peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+# -----------------------------------
+# ANN vs EXACT
+# -----------------------------------
+def ann_benchmark(vectors, k=10, configs=ANN_CONFIGS, n_queries=200, seed=0):
+    """Recall@k and latency of LSHIndex against exact cosine search.
+
+    Recall counts an approximate neighbour as correct if its score reaches
+    the exact k-th best score, so ties among equal vectors (common for genre
+    vectors) do not count as misses.
+    """
+    unit = dense_unit(vectors)
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(len(unit), min(n_queries, len(unit)), replace=False)
+
+    exact_ms, kth = [], {}
+    for q in queries.tolist():
+        t0 = time.perf_counter()
+        scores = (unit @ unit[q]).astype(np.float64)
+        scores[q] = -np.inf
+        top = top_indices(scores, k)
+        exact_ms.append((time.perf_counter() - t0) * 1e3)
+        kth[q] = scores[top[-1]] if len(top) else -np.inf
+
+    results = {"exact": {"latency_ms": percentiles(exact_ms)}}
+    for n_tables, probes in configs:
+        start = time.perf_counter()
+        lsh = LSHIndex(unit, n_tables=n_tables, probes=probes, seed=seed)
+        build = time.perf_counter() - start
+        ann_ms, recall, candidates = [], [], []
+        for q in queries.tolist():
+            t0 = time.perf_counter()
+            rows, scores = lsh.query_row(q, k)
+            ann_ms.append((time.perf_counter() - t0) * 1e3)
+            recall.append(float(np.sum(scores >= kth[q] - 1e-6)) / k)
+            candidates.append(len(lsh.candidates(unit[q])))
+        results[f"lsh t{n_tables} p{probes}"] = {
+            "params": lsh.params(), "build_s": build, f"recall@{k}": float(np.mean(recall)),
+            "candidates": float(np.mean(candidates)), "latency_ms": percentiles(ann_ms),
+        }
+    return results
+
+
+def synthetic_latent(n, dim=32, clusters=256, seed=0):
+    """Clustered Gaussian vectors shaped like ALS item factors."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim))
+    return (centres[rng.integers(0, clusters, n)]
+            + 0.5 * rng.standard_normal((n, dim))).astype(np.float32)
+
+
+def print_ann_report(name, n, k, results):
+    print(f"\n{name} vectors, {n:,} items")
+    print(f"{'method':<14}{'recall@'+str(k):>10}{'cands':>9}{'build s':>9}"
+          f"{'p50 ms':>9}{'p99 ms':>9}")
+    for method, r in results.items():
+        recall = r.get(f"recall@{k}", 1.0)
+        print(f"{method:<14}{recall:>10.3f}{r.get('candidates', n):>9.0f}"
+              f"{r.get('build_s', 0.0):>9.2f}{r['latency_ms']['p50']:>9.3f}"
+              f"{r['latency_ms']['p99']:>9.3f}")
+
+
+# -----------------------------------
+# SYNTHETIC DATA
+# -----------------------------------
+def make_synthetic(n_users, n_movies=2000, ratings_per_user=20, n_genres=18, seed=0):
+    """MovieLens-shaped (movies, ratings) frames with learnable structure.
+
+    Every movie has a primary genre and every user a favourite one; most of
+    a user's ratings fall in their favourite genre and are rated higher.
+    Popularity inside and across genres is skewed like real catalogues.
+    """
+    rng = np.random.default_rng(seed)
+    genre_names = np.array([f"Genre{g}" for g in range(n_genres)])
+    primary = rng.integers(0, n_genres, n_movies)
+    secondary = rng.integers(0, n_genres, n_movies)
+    genres = [g1 if a == b else f"{g1}|{g2}"
+              for a, b, g1, g2 in zip(primary, secondary, genre_names[primary],
+                                      genre_names[secondary])]
+    movies = pd.DataFrame({"movieId": np.arange(1, n_movies + 1, dtype=np.int32),
+                           "title": [f"Synthetic Movie {i}" for i in range(1, n_movies + 1)],
+                           "genres": genres})
+
+    counts = rng.poisson(ratings_per_user - 1, n_users) + 1
+    users = np.repeat(np.arange(1, n_users + 1, dtype=np.int32), counts)
+    favourite = rng.integers(0, n_genres, n_users)[users - 1]
+
+    # movies grouped by primary genre; skewed pick inside the favourite genre
+    by_genre = np.argsort(primary, kind="stable")
+    offsets = np.searchsorted(primary[by_genre], np.arange(n_genres + 1))
+    sizes = np.maximum(offsets[favourite + 1] - offsets[favourite], 1)
+    in_genre = by_genre[np.minimum(offsets[favourite] + (rng.random(len(users)) ** 2 * sizes)
+                                   .astype(np.int64), n_movies - 1)]
+    anywhere = (rng.random(len(users)) ** 3 * n_movies).astype(np.int64)
+    movie = np.where(rng.random(len(users)) < 0.7, in_genre, anywhere)
+
+    match = primary[movie] == favourite
+    score = 3.0 + 1.5 * match + rng.normal(0, 0.8, len(users))
+    rating = np.clip(np.round(score * 2) / 2, 0.5, 5.0).astype(np.float32)
+    timestamp = np.arange(len(users), dtype=np.int64)
+
+    ratings = pd.DataFrame({"userId": users, "movieId": (movie + 1).astype(np.int32),
+                            "rating": rating, "timestamp": timestamp})
+    ratings = ratings.drop_duplicates(["userId", "movieId"], keep="last")
+    return movies, ratings.reset_index(drop=True)
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def print_report(results):
+    ds = results["dataset"]
+    k = ds["k"]
+    print(f"\n{ds['users']:,} users, {ds['movies']:,} movies, {ds['ratings']:,} ratings "
+          f"({ds['split']}, {ds['evaluated_users']:,} users evaluated)")
+    print(f"{'strategy':<9}{'P@'+str(k):>8}{'R@'+str(k):>8}{'NDCG':>8}{'cover':>8}"
+          f"{'build s':>9}{'p50 ms':>9}{'p99 ms':>9}{'q/s':>9}{'build MB':>10}{'query MB':>10}")
+    for name, r in results["strategies"].items():
+        print(f"{name:<9}{r[f'precision@{k}']:>8.3f}{r[f'recall@{k}']:>8.3f}"
+              f"{r[f'ndcg@{k}']:>8.3f}{r['coverage']:>8.3f}{r['build_s']:>9.2f}"
+              f"{r['latency_ms']['p50']:>9.2f}{r['latency_ms']['p99']:>9.2f}"
+              f"{r['queries_per_s']:>9.0f}{r['build_peak_mb']:>10.1f}{r['query_peak_mb']:>10.2f}")
+    rss = ds.get("process_peak_rss_mb")
+    if rss is not None:
+        print(f"process peak RSS {rss:.0f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate the movie recommenders")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--synthetic", default=None,
+                        help="comma-separated user counts to generate instead of the CSVs")
+    parser.add_argument("--synthetic-movies", type=int, default=2000)
+    parser.add_argument("--write-synthetic", default=None,
+                        help="directory to also save generated movies.csv/ratings.csv")
+    parser.add_argument("--split", choices=["leave-last-out", "random"], default="leave-last-out")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--relevant-threshold", type=float, default=4.0)
+    parser.add_argument("--max-users", type=int, default=2000,
+                        help="evaluate at most this many users (0 = all)")
+    parser.add_argument("--ann", default=None,
+                        help="comma-separated catalogue sizes for the LSH vs exact benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write all results to this file")
+    args = parser.parse_args(argv)
+
+    strategies = [s for s in args.strategies.split(",") if s]
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(sorted(unknown))}")
+
+    if args.ann:
+        all_results = []
+        for n in (int(x) for x in args.ann.split(",")):
+            movies, _ = make_synthetic(1, n, seed=args.seed)
+            for name, vectors in (("genre", genre_matrix(movies["genres"])),
+                                  ("latent", synthetic_latent(n, seed=args.seed))):
+                results = ann_benchmark(vectors, args.k, seed=args.seed)
+                print_ann_report(name, n, args.k, results)
+                all_results.append({"vectors": name, "items": n, "k": args.k,
+                                    "results": results})
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(all_results, f, indent=2)
+        return
+
+    if args.synthetic:
+        datasets = []
+        for n in (int(x) for x in args.synthetic.split(",")):
+            movies, ratings = make_synthetic(n, args.synthetic_movies, seed=args.seed)
+            if args.write_synthetic:
+                out = os.path.join(args.write_synthetic, f"users_{n}")
+                os.makedirs(out, exist_ok=True)
+                movies.to_csv(os.path.join(out, "movies.csv"), index=False)
+                ratings.to_csv(os.path.join(out, "ratings.csv"), index=False)
+            datasets.append((movies, ratings))
+    else:
+        movies = load_movies(os.path.join(args.data_dir, "movies.csv"))
+        ratings = pd.read_csv(os.path.join(args.data_dir, "ratings.csv"))
+        datasets = [(movies, ratings)]
+
+    all_results = []
+    for movies, ratings in datasets:
+        results = evaluate(movies, ratings, strategies, args.split, args.k,
+                           args.relevant_threshold, args.max_users or None, args.seed)
+        print_report(results)
+        all_results.append(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
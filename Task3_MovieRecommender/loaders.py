@@ -0,0 +1,105 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+
+# -----------------------------------
+# STREAMING CSV LOADERS
+# -----------------------------------
+# ratings.csv is read in chunks with compact dtypes: int32 ids and ratings
+# as uint8 half-stars (4.5 -> 9).  Each chunk only appends to flat buffers
+# and grows the sorted id sets, so peak memory is roughly 9 bytes per rating
+# plus one chunk, instead of a full DataFrame of int64/float64 columns.
+
+CHUNK_ROWS = 1_000_000
+RATING_DTYPES = {"userId": np.int32, "movieId": np.int32, "rating": np.float32}
+MOVIE_DTYPES = {"movieId": np.int32, "title": str, "genres": str}
+
+
+class _Buffer:
+    """Append-only numpy array with amortised doubling."""
+
+    def __init__(self, dtype, capacity=1 << 16):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        need = self.size + len(values)
+        if need > len(self.data):
+            grown = np.empty(max(need, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:need] = values
+        self.size = need
+
+    def array(self):
+        return self.data[:self.size]
+
+
+def print_progress(rows, done_bytes, total_bytes):
+    pct = 100.0 * done_bytes / total_bytes if total_bytes else 100.0
+    end = "\n" if done_bytes >= total_bytes else ""
+    print(f"\r  {rows:,} rows ({pct:5.1f}%)", end=end, file=sys.stderr, flush=True)
+
+
+def read_ratings_csv(path, chunk_rows=CHUNK_ROWS, progress=None):
+    """Stream ratings.csv into (CSR matrix, user_ids, item_ids).
+
+    progress, if given, is called as progress(rows, bytes_read, total_bytes)
+    after every chunk.  Duplicate (user, movie) pairs are averaged.
+    """
+    total_bytes = os.path.getsize(path)
+    users = _Buffer(np.int32)
+    items = _Buffer(np.int32)
+    half_stars = _Buffer(np.uint8)
+    user_ids = np.empty(0, dtype=np.int32)
+    item_ids = np.empty(0, dtype=np.int32)
+
+    with open(path, "rb") as f:
+        reader = pd.read_csv(f, usecols=list(RATING_DTYPES), dtype=RATING_DTYPES,
+                             chunksize=chunk_rows)
+        for chunk in reader:
+            u = chunk["userId"].to_numpy()
+            m = chunk["movieId"].to_numpy()
+            users.extend(u)
+            items.extend(m)
+            half_stars.extend(np.rint(chunk["rating"].to_numpy() * 2).astype(np.uint8))
+            user_ids = np.union1d(user_ids, u)
+            item_ids = np.union1d(item_ids, m)
+            if progress is not None:
+                progress(users.size, f.tell(), total_bytes)
+
+    rows = np.searchsorted(user_ids, users.array()).astype(np.int32)
+    cols = np.searchsorted(item_ids, items.array()).astype(np.int32)
+    del users, items
+    shape = (len(user_ids), len(item_ids))
+    values = half_stars.array().astype(np.float32) / 2
+    matrix = coo_matrix((values, (rows, cols)), shape=shape).tocsr()
+
+    if matrix.nnz < len(values):
+        # pivot_table averaged duplicates; coo summed them
+        counts = coo_matrix((np.ones(len(values), dtype=np.float32), (rows, cols)),
+                            shape=shape).tocsr()
+        matrix.data /= counts.data
+    matrix.sort_indices()
+    return matrix, user_ids, item_ids
+
+
+def read_movies_csv(path, chunk_rows=CHUNK_ROWS, progress=None):
+    """movies.csv with int32 ids and string title/genres, read in chunks."""
+    total_bytes = os.path.getsize(path)
+    frames = []
+    rows = 0
+    with open(path, "rb") as f:
+        reader = pd.read_csv(f, usecols=list(MOVIE_DTYPES), dtype=MOVIE_DTYPES,
+                             keep_default_na=False, chunksize=chunk_rows)
+        for chunk in reader:
+            frames.append(chunk)
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows, f.tell(), total_bytes)
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in MOVIE_DTYPES.items()})
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,233 @@
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ann import LSHIndex
+from collab_engine import top_indices
+
+# -----------------------------------
+# MATRIX FACTORIZATION (ALS)
+# -----------------------------------
+# Ratings are approximated by mean + U @ V.T with `factors` latent
+# dimensions.  Each ALS half-step solves every user's (or item's) ridge
+# regression at once: for a block of rows, the per-row Gram matrices come
+# from one sparse x dense product over the outer products of just the
+# columns that block observes, and np.linalg.solve runs batched over it.
+# Scoring a user is then a single mat-vec over the item factors.
+
+MODEL_VERSION = 1
+BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _solve_side(ratings, fixed, reg):
+    """Least-squares factors for every row of `ratings` given `fixed`."""
+    n_rows = ratings.shape[0]
+    f = fixed.shape[1]
+    indptr, indices = ratings.indptr, ratings.indices
+    counts = np.diff(indptr)
+
+    eye = np.eye(f)
+    out = np.empty((n_rows, f), dtype=np.float64)
+    # a block holds at most max_nnz rows and observed ratings, so the outer
+    # products of the columns it touches fit in BLOCK_BYTES whatever the
+    # size of the matrix; a row with more ratings than that (a popular item)
+    # is a block of its own whose Gram matrix is summed max_nnz columns at a time
+    max_nnz = max(1, BLOCK_BYTES // (f * f * 8))
+    start = 0
+    while start < n_rows:
+        lo = indptr[start]
+        if counts[start] > max_nnz:
+            stop, hi = start + 1, indptr[start + 1]
+            gram = np.zeros((1, f, f))
+            for chunk in range(lo, hi, max_nnz):
+                v = fixed[indices[chunk:min(chunk + max_nnz, hi)]]
+                gram[0] += v.T @ v
+        else:
+            stop = int(np.searchsorted(indptr, lo + max_nnz, side="right")) - 1
+            stop = min(stop, start + max_nnz, n_rows)
+            hi = indptr[stop]
+            cols, local = np.unique(indices[lo:hi], return_inverse=True)
+            observed = csr_matrix((np.ones(hi - lo), local.ravel(), indptr[start:stop + 1] - lo),
+                                  shape=(stop - start, len(cols)))
+            v = fixed[cols]
+            outer = (v[:, :, None] * v[:, None, :]).reshape(len(cols), f * f)
+            gram = (observed @ outer).reshape(-1, f, f)
+        # weighted-lambda regularisation; rows with no ratings shrink to 0
+        gram += reg * np.maximum(counts[start:stop], 1)[:, None, None] * eye
+        rhs = ratings[start:stop] @ fixed
+        out[start:stop] = np.linalg.solve(gram, rhs[..., None])[..., 0]
+        start = stop
+    return out
+
+
+def _aligned(old_ids, old_factors, new_ids, rng, scale):
+    """Reuse factors for ids seen before; random init for new ones."""
+    factors = rng.normal(0, scale, (len(new_ids), old_factors.shape[1]))
+    pos = {int(x): i for i, x in enumerate(np.asarray(old_ids).tolist())}
+    for i, x in enumerate(np.asarray(new_ids).tolist()):
+        j = pos.get(int(x))
+        if j is not None:
+            factors[i] = old_factors[j]
+    return factors
+
+
+class ALSModel:
+    def __init__(self, factors=32, reg=0.1, iterations=10, seed=0):
+        self.factors = factors
+        self.reg = reg
+        self.iterations = iterations
+        self.seed = seed
+        self.user_factors = None
+        self.item_factors = None
+        self.user_ids = None
+        self.item_ids = None
+        self.global_mean = 0.0
+        self.signature = None
+        self._lsh = None
+
+    @property
+    def is_fitted(self):
+        return self.user_factors is not None
+
+    def fit(self, matrix, user_ids, item_ids, warm_start=False, signature=None):
+        """Train on a users x items CSR of explicit ratings."""
+        matrix = csr_matrix(matrix, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        scale = 0.1
+
+        self.global_mean = float(matrix.data.mean()) if matrix.nnz else 0.0
+        centred = matrix.copy()
+        centred.data -= self.global_mean
+        centred_t = centred.T.tocsr()
+
+        if warm_start and self.is_fitted and self.item_factors.shape[1] == self.factors:
+            items = _aligned(self.item_ids, self.item_factors, item_ids, rng, scale)
+        else:
+            items = rng.normal(0, scale, (len(item_ids), self.factors))
+
+        users = None
+        for _ in range(self.iterations):
+            users = _solve_side(centred, items, self.reg)
+            items = _solve_side(centred_t, users, self.reg)
+        if users is None:
+            users = _solve_side(centred, items, self.reg)
+
+        self.user_factors = users.astype(np.float32)
+        self.item_factors = items.astype(np.float32)
+        self.user_ids = np.asarray(user_ids)
+        self.item_ids = np.asarray(item_ids)
+        self._index_ids()
+        self.signature = signature
+        return self
+
+    def _index_ids(self):
+        self._lsh = None
+        self.user_row = {int(u): i for i, u in enumerate(self.user_ids.tolist())}
+        self.item_col = {int(m): j for j, m in enumerate(self.item_ids.tolist())}
+
+    def fold_in(self, user_id, item_ids, ratings):
+        """Re-solve one user's factors against the fixed item factors.
+
+        Used for freshly ingested ratings; movies the model has never seen
+        are ignored until the next full fit.
+        """
+        pairs = [(self.item_col[int(m)], float(r)) for m, r in zip(item_ids, ratings)
+                 if int(m) in self.item_col]
+        factors = np.zeros(self.factors, dtype=np.float32)
+        if pairs:
+            cols, values = zip(*pairs)
+            v = self.item_factors[list(cols)].astype(np.float64)
+            gram = v.T @ v + self.reg * len(cols) * np.eye(v.shape[1])
+            rhs = v.T @ (np.array(values) - self.global_mean)
+            factors = np.linalg.solve(gram, rhs).astype(np.float32)
+
+        if not self.user_factors.flags.writeable:      # memory-mapped artifact
+            self.user_factors = np.array(self.user_factors)
+        u = self.user_row.get(int(user_id))
+        if u is None:
+            u = len(self.user_ids)
+            self.user_row[int(user_id)] = u
+            self.user_ids = np.append(self.user_ids, int(user_id))
+            self.user_factors = np.vstack([self.user_factors, factors])
+        else:
+            self.user_factors[u] = factors
+
+    # ---------- persistence ----------
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, version=MODEL_VERSION,
+                 params=np.array(self.params()),
+                 user_factors=self.user_factors, item_factors=self.item_factors,
+                 user_ids=self.user_ids, item_ids=self.item_ids,
+                 global_mean=self.global_mean, signature=str(self.signature or ""))
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_arrays(cls, params, user_factors, item_factors, user_ids, item_ids,
+                    global_mean, signature=None):
+        factors, reg, iterations, seed = params
+        model = cls(int(factors), float(reg), int(iterations), int(seed))
+        model.user_factors = user_factors
+        model.item_factors = item_factors
+        model.user_ids = user_ids
+        model.item_ids = item_ids
+        model.global_mean = float(global_mean)
+        model.signature = signature
+        model._index_ids()
+        return model
+
+    def params(self):
+        return [self.factors, self.reg, self.iterations, self.seed]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            if int(f["version"]) != MODEL_VERSION:
+                return None
+            return cls.from_arrays(f["params"].tolist(), f["user_factors"],
+                                   f["item_factors"], f["user_ids"], f["item_ids"],
+                                   f["global_mean"], str(f["signature"]) or None)
+
+    # ---------- queries ----------
+    def predict(self, user_id):
+        """Predicted rating for every item, or None for an unknown user."""
+        u = self.user_row.get(int(user_id))
+        if u is None:
+            return None
+        return self.item_factors @ self.user_factors[u] + self.global_mean
+
+    def recommend(self, user_id, top_n=5, exclude_items=None):
+        """Movie ids with the highest predicted rating, or None if unknown."""
+        scores = self.predict(user_id)
+        if scores is None:
+            return None
+        scores = scores.astype(np.float64)
+        if exclude_items is not None and len(exclude_items):
+            scores[np.isin(self.item_ids, exclude_items)] = -np.inf
+        return self.item_ids[top_indices(scores, top_n)].tolist()
+
+    def similar_items(self, movie_id, top_n=5, ann=None):
+        """Movie ids closest to movie_id in latent space (cosine), or None.
+
+        With `ann` (LSHIndex parameters) the search runs over an LSH index
+        of the item factors, built on first use, instead of every item.
+        """
+        j = self.item_col.get(int(movie_id))
+        if j is None:
+            return None
+        if ann is not None:
+            if self._lsh is None or self._lsh[0] != ann:
+                self._lsh = (dict(ann), LSHIndex(self.item_factors, **ann))
+            rows, _ = self._lsh[1].query_row(j, top_n)
+            return self.item_ids[rows].tolist()
+
+        factors = self.item_factors
+        norms = np.linalg.norm(factors, axis=1)
+        denom = norms * norms[j]
+        scores = (factors @ factors[j]).astype(np.float64)
+        np.divide(scores, denom, out=scores, where=denom > 0)
+        scores[denom == 0] = -np.inf
+        scores[j] = -np.inf
+        return self.item_ids[top_indices(scores, top_n)].tolist()
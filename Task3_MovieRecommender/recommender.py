@@ -0,0 +1,307 @@
+import json
+import os
+
+import artifacts
+from cache import DEFAULT_SIZE, LRUCache
+from collab_engine import CollaborativeEngine, DEFAULT_NEIGHBOURS
+from content_index import GenreIndex, source_signature
+from loaders import read_movies_csv, read_ratings_csv
+from mf_model import ALSModel
+
+# -----------------------------------
+# HEADLESS RECOMMENDER
+# -----------------------------------
+# Everything needed to answer a recommendation query, with no GUI imports and
+# no work done at import time.  app.py (Tkinter) and batch_recommend.py (CLI)
+# both sit on top of this module.
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+ARTIFACTS_DIR = os.path.join(CACHE_DIR, "artifacts")
+
+
+def load_movies(path, progress=None):
+    movies = read_movies_csv(path, progress=progress)
+    movies["title"] = movies["title"].astype(str)
+    movies["genres"] = movies["genres"].astype(str)
+    return movies
+
+
+def load_ratings(path, progress=None):
+    """Stream ratings.csv straight into a CollaborativeEngine."""
+    return CollaborativeEngine(*read_ratings_csv(path, progress=progress))
+
+
+# factors / reg / iterations for the matrix-factorization strategy
+MF_PARAMS = {"factors": 32, "reg": 0.1, "iterations": 10}
+# LSHIndex parameters (see ann.py) to build the genre index approximately,
+# e.g. {"n_tables": 8, "probes": 2} for catalogues too large for the exact
+# quadratic build; None builds it exactly
+GENRE_ANN = None
+
+
+class Recommender:
+    def __init__(self, movies, collab_engine, genre_index, movies_csv=None,
+                 ratings_csv=None, cache_dir=CACHE_DIR, mf_params=None, mf_model=None,
+                 cache_size=DEFAULT_SIZE):
+        self.movies = movies
+        self.collab_engine = collab_engine
+        self.genre_index = genre_index
+        self.movies_csv = movies_csv
+        self.ratings_csv = ratings_csv
+        self.cache_dir = cache_dir
+        self.mf_params = dict(MF_PARAMS, **(mf_params or {}))
+        self._mf_model = mf_model
+        # users with add_ratings() data the ALS model has not seen yet
+        self._unfolded_users = set()
+        self.title_of = dict(zip(movies["movieId"], movies["title"]))
+        # query results, keyed on the data version they were computed from
+        self.cache = LRUCache(cache_size)
+        self._movies_version = 0
+        self._ratings_version = 0
+        self._ratings_signature = (source_signature(ratings_csv)
+                                   if ratings_csv and os.path.exists(ratings_csv) else None)
+
+    @classmethod
+    def from_csv(cls, data_dir=DATA_DIR, cache_dir=CACHE_DIR, mf_params=None,
+                 progress=None):
+        movies_csv = os.path.join(data_dir, "movies.csv")
+        ratings_csv = os.path.join(data_dir, "ratings.csv")
+        movies = load_movies(movies_csv, progress=progress)
+        engine = load_ratings(ratings_csv, progress=progress)
+        genre_index = GenreIndex.load_or_build(
+            movies_csv, os.path.join(cache_dir, "genre_index.npz"), movies=movies,
+            ann=GENRE_ANN)
+        return cls(movies, engine, genre_index,
+                   movies_csv=movies_csv, ratings_csv=ratings_csv,
+                   cache_dir=cache_dir, mf_params=mf_params)
+
+    @classmethod
+    def from_artifacts(cls, build_dir, data_dir=DATA_DIR, cache_dir=CACHE_DIR,
+                       mf_params=None):
+        """Memory-map a prebuilt artifact directory (see artifacts.py)."""
+        movies, engine, genre_index, mf_model = artifacts.load_components(build_dir)
+        return cls(movies, engine, genre_index,
+                   movies_csv=os.path.join(data_dir, "movies.csv"),
+                   ratings_csv=os.path.join(data_dir, "ratings.csv"),
+                   cache_dir=cache_dir, mf_params=mf_params, mf_model=mf_model)
+
+    @classmethod
+    def load(cls, data_dir=DATA_DIR, cache_dir=CACHE_DIR, artifacts_dir=ARTIFACTS_DIR,
+             mf_params=None):
+        """Prebuilt artifacts if they match the CSVs, else build from the CSVs."""
+        build_dir = artifacts.current_build(artifacts_dir)
+        if build_dir is not None:
+            manifest = artifacts.read_manifest(build_dir)
+            if manifest is not None and artifacts.is_fresh(
+                    manifest, os.path.join(data_dir, "movies.csv"),
+                    os.path.join(data_dir, "ratings.csv")):
+                return cls.from_artifacts(build_dir, data_dir, cache_dir, mf_params)
+        return cls.from_csv(data_dir, cache_dir, mf_params)
+
+    @property
+    def titles(self):
+        return self.movies["title"].tolist()
+
+    @property
+    def user_ids(self):
+        return self.collab_engine.user_ids.tolist()
+
+    @property
+    def movie_ids(self):
+        return self.movies["movieId"].tolist()
+
+    def refresh(self):
+        """Reload movies.csv / ratings.csv if either file changed on disk.
+
+        A ratings reload replaces the engine, so ratings ingested with
+        add_ratings() since the last load are dropped; the ALS model is
+        retrained (warm-started) on next use.
+        """
+        if (self.movies_csv is not None
+                and not self.genre_index.is_current(self.movies_csv, ann=GENRE_ANN)):
+            self.movies = load_movies(self.movies_csv)
+            self.title_of = dict(zip(self.movies["movieId"], self.movies["title"]))
+            self.genre_index = GenreIndex.load_or_build(
+                self.movies_csv, os.path.join(self.cache_dir, "genre_index.npz"),
+                movies=self.movies, ann=GENRE_ANN)
+            self._movies_version += 1
+
+        if self._ratings_signature is not None:
+            signature = source_signature(self.ratings_csv)
+            if signature != self._ratings_signature:
+                self.collab_engine = load_ratings(self.ratings_csv)
+                self._mf_model = None
+                self._unfolded_users.clear()
+                self._ratings_signature = signature
+                self._ratings_version += 1
+
+    def _cached(self, key, compute):
+        return list(self.cache.get_or_compute(key, lambda: tuple(compute())))
+
+    def _ratings_key(self):
+        return (self._movies_version, self._ratings_version, self.collab_engine.version)
+
+    @property
+    def mf_model(self):
+        """ALS model, trained on first use.
+
+        A saved model for the same ratings.csv and parameters is loaded as is;
+        a saved model for older data is used to warm-start training.  Users
+        with ratings ingested before the model was loaded are folded in.
+        """
+        if self._mf_model is None:
+            self._mf_model = self.train_mf_model()
+            self._fold_in(self._unfolded_users)
+            self._unfolded_users.clear()
+        return self._mf_model
+
+    def _fold_in(self, user_ids):
+        engine = self.collab_engine
+        for user_id in user_ids:
+            row = engine.user_rows([engine.user_row[user_id]])
+            self._mf_model.fold_in(user_id, engine.item_ids[row.indices], row.data)
+
+    def train_mf_model(self, warm_start_path=None, save=True):
+        params = self.mf_params
+        path = os.path.join(self.cache_dir, "als_model.npz")
+        signature = None
+        if self.ratings_csv is not None:
+            signature = "{}-f{factors}-r{reg}-i{iterations}".format(
+                source_signature(self.ratings_csv), **params)
+
+        saved = None
+        source = warm_start_path or path
+        if os.path.exists(source):
+            try:
+                saved = ALSModel.load(source)
+            except (OSError, ValueError, KeyError):
+                saved = None
+        if saved is not None and signature is not None and saved.signature == signature:
+            return saved
+
+        model = saved if saved is not None else ALSModel()
+        model.factors = params["factors"]
+        model.reg = params["reg"]
+        model.iterations = params["iterations"]
+        engine = self.collab_engine
+        model.fit(engine.ratings_matrix(), engine.user_ids, engine.item_ids,
+                  warm_start=saved is not None, signature=signature)
+        if save:
+            model.save(path)
+        return model
+
+    # ---------- incremental updates ----------
+    def add_ratings(self, records):
+        """Ingest (userId, movieId, rating) triples or dicts with those keys.
+
+        Collaborative results reflect them on the next query; the ALS model
+        re-solves the affected users' factors (once it is loaded, if it is
+        not yet).  Returns the ids of users whose neighbour lists were
+        invalidated.
+        """
+        triples = []
+        for r in records:
+            if isinstance(r, dict):
+                r = (r["userId"], r["movieId"], r["rating"])
+            triples.append((int(r[0]), int(r[1]), float(r[2])))
+
+        engine = self.collab_engine
+        affected = engine.add_ratings(triples)
+        users = {t[0] for t in triples}
+        if self._mf_model is not None:
+            self._fold_in(users)
+        else:
+            self._unfolded_users.update(users)
+        return affected
+
+    def ingest_jsonl(self, source, batch_size=1000):
+        """add_ratings() from a JSONL file path or an iterable of lines."""
+        lines = open(source, encoding="utf-8") if isinstance(source, str) else source
+        total, batch = 0, []
+        try:
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    self.add_ratings(batch)
+                    total, batch = total + len(batch), []
+            if batch:
+                self.add_ratings(batch)
+                total += len(batch)
+        finally:
+            if lines is not source:
+                lines.close()
+        return total
+
+    # ---------- queries ----------
+    def recommend_content_based(self, movie_title, top_n=5):
+        self.refresh()
+        return self._cached(("content", movie_title, top_n, self._movies_version),
+                            lambda: self._content_based(movie_title, top_n))
+
+    def _content_based(self, movie_title, top_n):
+        results = self.genre_index.similar(movie_title, top_n)
+        if results is None:
+            return ["Movie not found"]
+        return results
+
+    def recommend_collaborative(self, user_id, top_n=5, k=DEFAULT_NEIGHBOURS):
+        self.refresh()
+        return self._cached(("collaborative", user_id, top_n, k, self._ratings_key()),
+                            lambda: self._collaborative(user_id, top_n, k))
+
+    def _collaborative(self, user_id, top_n, k):
+        movie_ids = self.collab_engine.recommend(user_id, top_n=top_n, k=k)
+        if movie_ids is None:
+            return ["User not found"]
+
+        final = [self.title_of[m] for m in movie_ids if m in self.title_of]
+
+        # EXTRA: Remove duplicates or mistakes
+        final = list(dict.fromkeys(final))
+
+        return final
+
+    def recommend_matrix_factorization(self, user_id, top_n=5):
+        self.refresh()
+        return self._cached(("mf", user_id, top_n, self._ratings_key()),
+                            lambda: self._matrix_factorization(user_id, top_n))
+
+    def _matrix_factorization(self, user_id, top_n):
+        engine = self.collab_engine
+        if not engine.has_user(user_id):
+            return ["User not found"]
+        seen = engine.rated_items(user_id)
+        movie_ids = self.mf_model.recommend(user_id, top_n=top_n, exclude_items=seen)
+        if movie_ids is None:
+            return ["User not found"]
+        return list(dict.fromkeys(self.title_of[m] for m in movie_ids if m in self.title_of))
+
+
+# -----------------------------------
+# MODULE-LEVEL SHORTCUTS
+# -----------------------------------
+_default = None
+
+
+def get_recommender():
+    """Shared Recommender over the bundled CSVs, built on first use."""
+    global _default
+    if _default is None:
+        _default = Recommender.load()
+    return _default
+
+
+def recommend_content_based(movie_title, top_n=5):
+    return get_recommender().recommend_content_based(movie_title, top_n)
+
+
+def recommend_collaborative(user_id, top_n=5, k=DEFAULT_NEIGHBOURS):
+    return get_recommender().recommend_collaborative(user_id, top_n, k)
+
+
+def recommend_matrix_factorization(user_id, top_n=5):
+    return get_recommender().recommend_matrix_factorization(user_id, top_n)
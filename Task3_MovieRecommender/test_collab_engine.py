@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from collab_engine import CollaborativeEngine
+
+TOP_N = 10
+
+
+def random_ratings(n_users=60, n_movies=80, per_user=12, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for user in range(1, n_users + 1):
+        for movie in rng.choice(np.arange(1, n_movies + 1), per_user, replace=False):
+            rows.append((user, int(movie), float(rng.integers(1, 11)) / 2))
+    return pd.DataFrame(rows, columns=["userId", "movieId", "rating"])
+
+
+def vote_scores(engine, user_id):
+    """Similarity-weighted vote per movie id, as recommend() ranks them."""
+    rows, sims = engine.similar_users(user_id)
+    weighted = np.asarray(engine.user_rows(rows).T @ sims, dtype=np.float64).ravel()
+    return dict(zip(engine.item_ids.tolist(), weighted))
+
+
+def assert_same_ranking(got, expected, scores):
+    """Equal up to the order of movies whose scores tie."""
+    assert len(got) == len(expected)
+    for a, b in zip(got, expected):
+        assert abs(scores[a] - scores[b]) < 1e-5, (got, expected)
+
+
+def test_ingest_matches_rebuild():
+    base = random_ratings()
+    new = [
+        (5, int(base[base.userId == 5].movieId.iloc[0]), 0.5),     # overwrite
+        (5, 79, 5.0), (5, 80, 4.5),                                # existing user, new movies
+        (999, 3, 5.0), (999, 17, 4.0), (999, 42, 4.5), (999, 81, 3.0),   # new user, new movie
+    ]
+
+    engine = CollaborativeEngine.from_frame(base)
+    for user_id in engine.user_ids[:20]:
+        engine.recommend(user_id, TOP_N)                           # fill the neighbour cache
+    engine.add_ratings(new)
+
+    combined = pd.concat([base, pd.DataFrame(new, columns=base.columns)])
+    combined = combined.drop_duplicates(["userId", "movieId"], keep="last")
+    rebuilt = CollaborativeEngine.from_frame(combined)
+
+    for user_id in rebuilt.user_ids.tolist():
+        assert_same_ranking(engine.recommend(user_id, TOP_N),
+                            rebuilt.recommend(user_id, TOP_N),
+                            vote_scores(rebuilt, user_id))
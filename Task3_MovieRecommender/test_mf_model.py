@@ -0,0 +1,59 @@
+import tracemalloc
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import mf_model
+from mf_model import _solve_side
+
+
+def reference_solve(ratings, fixed, reg):
+    """Row-by-row ridge regression, the definition _solve_side must match."""
+    f = fixed.shape[1]
+    out = np.zeros((ratings.shape[0], f))
+    for r in range(ratings.shape[0]):
+        row = ratings.getrow(r)
+        v = fixed[row.indices]
+        gram = v.T @ v + reg * max(row.nnz, 1) * np.eye(f)
+        out[r] = np.linalg.solve(gram, v.T @ row.data)
+    return out
+
+
+def heavy_row_matrix(n_cols, seed=0):
+    """Row 0 observes every column (a popular item); the others a handful."""
+    rng = np.random.default_rng(seed)
+    rows = [np.zeros(n_cols, dtype=int)]
+    cols = [np.arange(n_cols)]
+    for r in range(1, 6):
+        picked = rng.choice(n_cols, size=r * 3, replace=False)
+        rows.append(np.full(len(picked), r))
+        cols.append(picked)
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    data = rng.uniform(-2, 2, len(rows))
+    return csr_matrix((data, (rows, cols)), shape=(7, n_cols))
+
+
+def test_heavy_row_matches_reference(monkeypatch):
+    monkeypatch.setattr(mf_model, "BLOCK_BYTES", 64 * 1024)       # max_nnz = 128
+    ratings = heavy_row_matrix(1000)
+    fixed = np.random.default_rng(1).normal(size=(1000, 8))
+    np.testing.assert_allclose(_solve_side(ratings, fixed, 0.1),
+                               reference_solve(ratings, fixed, 0.1), rtol=1e-8, atol=1e-10)
+
+
+def test_heavy_row_memory_is_bounded(monkeypatch):
+    block = 1024 * 1024
+    monkeypatch.setattr(mf_model, "BLOCK_BYTES", block)
+    n_cols, f = 200_000, 8
+    ratings = heavy_row_matrix(n_cols)
+    fixed = np.random.default_rng(1).normal(size=(n_cols, f))
+
+    tracemalloc.start()
+    try:
+        _solve_side(ratings, fixed, 0.1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the heavy row's outer products alone would take n_cols * f * f * 8 = 100 MB;
+    # allow the block plus a copy of the row itself
+    assert peak < 2 * block + ratings.nnz * 16